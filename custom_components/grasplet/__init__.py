@@ -2,44 +2,95 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
+import time
+from typing import TYPE_CHECKING
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.importlib import async_import_module
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
-from .coordinator import GraspletDataUpdateCoordinator
+from .const import DATA_SCHEDULER, DOMAIN, STORAGE_KEY, STORAGE_VERSION
+from .scheduler import GraspletScheduler
+from .services import async_setup_services
+
+if TYPE_CHECKING:
+    from .coordinator import GraspletDataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Grasplet services and the shared poll scheduler."""
+    hass.data[DATA_SCHEDULER] = GraspletScheduler()
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Grasplet from a config entry."""
-    coordinator = GraspletDataUpdateCoordinator(hass, entry)
+    start = time.monotonic()
+    # Imported in the executor on first use, so the config flow, which also
+    # loads this package, does not pull in the coordinator and HTTP client
+    coordinator_module = await async_import_module(hass, f"{__package__}.coordinator")
+    coordinator: GraspletDataUpdateCoordinator = (
+        coordinator_module.GraspletDataUpdateCoordinator(hass, entry)
+    )
     
-    await coordinator.async_config_entry_first_refresh()
+    # With a cached snapshot the entities can be created straight away and
+    # the API is queried in the background; otherwise wait for the first fetch
+    cached = await coordinator.async_load_cache()
+    if not cached:
+        await coordinator.async_config_entry_first_refresh()
     
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
     
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
+    entry.async_on_unload(entry.add_update_listener(async_update_entry))
+    
+    if cached:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN}_refresh_{entry.entry_id}"
+        )
+    
+    _LOGGER.debug(
+        "Set up %s in %.3f seconds (%s)",
+        entry.title,
+        time.monotonic() - start,
+        "from cache" if cached else "without cache",
+    )
+    
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator: GraspletDataUpdateCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
     
     return unload_ok
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
\ No newline at end of file
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the snapshot cache when the entry is deleted."""
+    store = Store(hass, STORAGE_VERSION, STORAGE_KEY.format(entry_id=entry.entry_id))
+    await store.async_remove()
+
+
+async def async_update_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply an updated entry, reloading only if the credentials changed."""
+    coordinator: GraspletDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    if coordinator.credentials_changed():
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    coordinator.async_apply_options()
\ No newline at end of file
@@ -0,0 +1,439 @@
+"""API client for the Grasplet integration."""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from contextlib import nullcontext
+from typing import Any
+
+import aiohttp
+import ijson
+from aiohttp import hdrs
+from homeassistant.util.json import json_loads
+
+from .const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    DATA_URL,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_READ_TIMEOUT,
+    LOGIN_URL,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+    STREAM_CHUNK_SIZE,
+    STREAM_DECODE_THRESHOLD,
+)
+from .models import API_SIM_KEYS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GraspletApiError(Exception):
+    """Error to indicate a failed Grasplet API request."""
+
+
+class GraspletConnectionError(GraspletApiError):
+    """Error to indicate the Grasplet API could not be reached."""
+
+
+class GraspletCircuitOpenError(GraspletConnectionError):
+    """Error to indicate requests are paused after repeated failures."""
+
+
+class GraspletAuthError(GraspletApiError):
+    """Error to indicate the credentials were rejected."""
+
+
+class GraspletTokenRejected(GraspletApiError):
+    """Error to indicate the API rejected the access token."""
+
+
+def _jwt_expiry(token: str) -> float | None:
+    """Return the exp claim of a JWT access token, if it has one."""
+    try:
+        segment = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+# Keys kept while stream-decoding a SIM list, mapped to themselves so every
+# object shares one copy of each key string
+_KEPT_KEYS: dict[str, str] = {key: key for key in ("result", "data", *API_SIM_KEYS)}
+
+
+class _SlimObject(dict):
+    """JSON object that drops keys the integration never reads as it is built."""
+
+    __slots__ = ()
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """Store the value only if its key is read."""
+        if (kept := _KEPT_KEYS.get(key)) is not None:
+            dict.__setitem__(self, kept, value)
+
+
+async def _read_body(response: aiohttp.ClientResponse) -> bytes:
+    """Read a whole response body."""
+    return await response.read()
+
+
+def _token_expiry(data: dict[str, Any]) -> float | None:
+    """Work out when a token from the login response expires."""
+    if (expires_in := data.get("expires_in")) is not None:
+        try:
+            return time.time() + float(expires_in)
+        except (TypeError, ValueError):
+            pass
+    return _jwt_expiry(data["access_token"])
+
+
+class CircuitBreaker:
+    """Stop calling the API for a while after repeated failed attempts.
+
+    Once open, requests are rejected until reset_timeout has passed. A
+    single trial request is then let through; it closes the breaker if it
+    succeeds and re-opens it if it fails.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        """Return closed, open or half_open."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self._reset_timeout:
+            return "open"
+        return "half_open"
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now."""
+        state = self.state
+        if state == "half_open":
+            # Let this trial through and hold everyone else back until it
+            # finishes; a trial that never reports back is replaced after
+            # another reset_timeout
+            self._opened_at = time.monotonic()
+        return state != "open"
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful attempt."""
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a failed attempt, opening the breaker at the threshold."""
+        self._failures += 1
+        if self._failures >= self._failure_threshold or self._opened_at is not None:
+            # A failed trial request while half open re-opens immediately
+            self._opened_at = time.monotonic()
+
+
+class GraspletApiClient:
+    """Grasplet API client using a shared aiohttp session."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        username: str,
+        password: str,
+        *,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> None:
+        """Initialize the API client.
+
+        semaphore, if given, is held for each HTTP attempt, so clients
+        sharing it have a cap on requests in flight.
+        """
+        self._session = session
+        self._username = username
+        self._password = password
+        self._semaphore = semaphore
+        self.configure(
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            max_retries=max_retries,
+        )
+        self.breaker = CircuitBreaker()
+        self.access_token: str | None = None
+        self.token_expires_at: float | None = None
+
+        # Request counters
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+        self.last_latency: float | None = None
+        self.total_latency = 0.0
+        self.last_response_bytes: int | None = None
+        self.last_decode_time: float | None = None
+
+        # Validators of the last SIM list, used to skip unchanged responses
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+        self._payload_hash: bytes | None = None
+
+    def configure(
+        self, *, connect_timeout: float, read_timeout: float, max_retries: int
+    ) -> None:
+        """Set the timeouts and retry count used by later requests."""
+        self._timeout = aiohttp.ClientTimeout(connect=connect_timeout, sock_read=read_timeout)
+        self._max_retries = max_retries
+
+    async def _async_request(
+        self,
+        method: str,
+        url: str,
+        *,
+        reader: Callable[[aiohttp.ClientResponse], Awaitable[Any]] = _read_body,
+        **kwargs: Any,
+    ) -> tuple[int, Any, Mapping[str, str]]:
+        """Send a request with timeouts and retries.
+
+        Returns the status, the body of 200/201 responses as read by reader
+        and the headers.
+
+        Connection errors, timeouts, 429 and 5xx responses are retried with
+        exponential backoff and full jitter. Other statuses are returned to
+        the caller, which decides what they mean.
+        """
+        if not self.breaker.allow_request():
+            raise GraspletCircuitOpenError(
+                "Grasplet API requests paused after repeated failures"
+            )
+
+        error: Exception | None = None
+        status: int | None = None
+
+        for attempt in range(self._max_retries + 1):
+            if attempt:
+                backoff = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** (attempt - 1))
+                await asyncio.sleep(random.uniform(0, backoff))
+                self.retries += 1
+
+            self.attempts += 1
+            error = status = body = None
+            # Only the attempt itself holds the shared slot, not the backoff
+            async with self._semaphore or nullcontext():
+                start = time.monotonic()
+                try:
+                    async with self._session.request(
+                        method, url, timeout=self._timeout, **kwargs
+                    ) as response:
+                        status = response.status
+                        headers = response.headers
+                        body = await reader(response) if status in (200, 201) else None
+                except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                    error = err
+                finally:
+                    self.last_latency = time.monotonic() - start
+                    self.total_latency += self.last_latency
+
+            if error is None and status is not None and status < 500 and status != 429:
+                self.breaker.record_success()
+                return status, body, headers
+
+            self.failures += 1
+            self.breaker.record_failure()
+            _LOGGER.debug(
+                "Request to %s failed (attempt %d of %d): %s",
+                url,
+                attempt + 1,
+                self._max_retries + 1,
+                error or status,
+            )
+            if self.breaker.state == "open":
+                # Stop retrying as soon as the breaker trips
+                break
+
+        if error is not None:
+            raise GraspletConnectionError(f"Request failed: {error!r}") from error
+        raise GraspletConnectionError(f"Server error: {status}")
+
+    def _decode(self, raw: bytes | None) -> Any:
+        """Decode a JSON response body, recording its size and decode time."""
+        if raw is None:
+            return None
+        start = time.monotonic()
+        try:
+            return json_loads(raw)
+        except ValueError as err:
+            raise GraspletApiError(f"Invalid JSON response: {err}") from err
+        finally:
+            self.last_response_bytes = len(raw)
+            self.last_decode_time = time.monotonic() - start
+
+    def reset_validators(self) -> None:
+        """Forget the last SIM list so the next fetch is processed in full."""
+        self._etag = self._last_modified = self._payload_hash = None
+
+    @property
+    def credentials(self) -> tuple[str, str]:
+        """Return the username and password the client logs in with."""
+        return self._username, self._password
+
+    def set_token(self, access_token: str | None, expires_at: float | None) -> None:
+        """Use a token obtained elsewhere, e.g. restored from storage."""
+        self.access_token = access_token
+        self.token_expires_at = expires_at
+
+    def token_valid(self, margin: float = 0) -> bool:
+        """Return True if the access token is usable for at least margin seconds."""
+        if not self.access_token:
+            return False
+        if self.token_expires_at is None:
+            return True
+        return time.time() < self.token_expires_at - margin
+
+    async def async_login(self) -> None:
+        """Authenticate with Grasplet API."""
+        payload = {
+            "username": self._username,
+            "password": self._password,
+        }
+
+        # Mask password in logs
+        _LOGGER.debug("Authenticating with username: %s", payload["username"])
+
+        try:
+            status, raw, _ = await self._async_request("POST", LOGIN_URL, json=payload)
+        except GraspletConnectionError as err:
+            _LOGGER.error("Network error during authentication: %s", err)
+            raise
+
+        if status == 201:
+            result = self._decode(raw)
+            if result.get("result") and "access_token" in result.get("data", {}):
+                self.access_token = result["data"]["access_token"]
+                self.token_expires_at = _token_expiry(result["data"])
+                _LOGGER.debug("Authentication successful")
+                return
+
+        _LOGGER.error("Authentication failed with status: %s", status)
+        if status == 401:
+            raise GraspletAuthError("Invalid credentials")
+        raise GraspletApiError(f"Authentication failed: {status}")
+
+    async def _read_sims(
+        self, response: aiohttp.ClientResponse
+    ) -> tuple[bytes, list[bytes]]:
+        """Read the SIM list body in chunks, hashing it as it arrives."""
+        length = response.content_length
+        if length is not None and length < STREAM_DECODE_THRESHOLD:
+            raw = await response.read()
+            return hashlib.blake2b(raw, digest_size=16).digest(), [raw]
+
+        digest = hashlib.blake2b(digest_size=16)
+        chunks: list[bytes] = []
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            digest.update(chunk)
+            chunks.append(chunk)
+        return digest.digest(), chunks
+
+    async def _async_decode_sims(self, chunks: list[bytes]) -> Any:
+        """Decode a SIM list body read by _read_sims, recording its decode time.
+
+        Bodies of STREAM_DECODE_THRESHOLD or more are decoded in one
+        incremental pass that drops unused fields as each object is built,
+        so the full decoded response is never held. Each chunk is released
+        once consumed and the event loop runs between chunks.
+        """
+        size = sum(map(len, chunks))
+        if size < STREAM_DECODE_THRESHOLD:
+            return self._decode(b"".join(chunks))
+
+        decoded = ijson.sendable_list()
+        parser = ijson.items_coro(decoded, "", map_type=_SlimObject, use_float=True)
+        decode_time = 0.0
+        chunks.reverse()
+        try:
+            while chunks:
+                start = time.monotonic()
+                parser.send(chunks.pop())
+                decode_time += time.monotonic() - start
+                await asyncio.sleep(0)
+            start = time.monotonic()
+            parser.close()
+            decode_time += time.monotonic() - start
+        except ijson.JSONError as err:
+            raise GraspletApiError(f"Invalid JSON response: {err}") from err
+        finally:
+            self.last_response_bytes = size
+            self.last_decode_time = decode_time
+        return decoded[0]
+
+    async def async_get_sims(self) -> list[dict[str, Any]] | None:
+        """Fetch SIM data from Grasplet API.
+
+        Returns None when the SIM list is unchanged since the last call,
+        either because the server answered 304 Not Modified or because the
+        body hashes the same; the body is then not decoded.
+        """
+        if not self.access_token:
+            raise GraspletApiError("No access token available")
+
+        headers = {"Authorization": f"Bearer {self.access_token}"}
+        if self._etag:
+            headers[hdrs.IF_NONE_MATCH] = self._etag
+        if self._last_modified:
+            headers[hdrs.IF_MODIFIED_SINCE] = self._last_modified
+
+        try:
+            status, body, response_headers = await self._async_request(
+                "GET", DATA_URL, reader=self._read_sims, headers=headers
+            )
+        except GraspletConnectionError as err:
+            _LOGGER.error("Network error fetching SIM data: %s", err)
+            raise
+
+        if status == 304:
+            _LOGGER.debug("SIM data not modified")
+            self.last_response_bytes = 0
+            self.last_decode_time = 0.0
+            return None
+
+        if status == 200:
+            digest, chunks = body
+            if digest == self._payload_hash:
+                # Compared before decoding, so unchanged bodies are never decoded
+                _LOGGER.debug("SIM data unchanged")
+                self.last_response_bytes = sum(map(len, chunks))
+                self.last_decode_time = 0.0
+                return None
+
+            result = await self._async_decode_sims(chunks)
+            if result.get("result") and "data" in result:
+                sims = result["data"]
+                _LOGGER.debug("Successfully fetched data for %d SIMs", len(sims))
+                self._etag = response_headers.get(hdrs.ETAG)
+                self._last_modified = response_headers.get(hdrs.LAST_MODIFIED)
+                self._payload_hash = digest
+                return sims
+
+        if status == 401:
+            # Token expired, clear it so the caller re-authenticates
+            self.set_token(None, None)
+            raise GraspletTokenRejected("Access token expired")
+
+        _LOGGER.error("Failed to fetch SIM data with status: %s", status)
+        raise GraspletApiError(f"Failed to fetch data: {status}")
@@ -1,19 +1,63 @@
 """Config flow for Grasplet integration."""
 from __future__ import annotations
 
+import functools
 import logging
+from collections.abc import Mapping
 from typing import Any
 
-import aiohttp
 import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.importlib import async_import_module
+from homeassistant.helpers.selector import SelectSelector, SelectSelectorConfig
 
-from .const import CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL, DOMAIN, LOGIN_URL
+from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_CONNECT_TIMEOUT,
+    CONF_DAILY_REQUEST_BUDGET,
+    CONF_EVENT_EXPIRY_DAYS,
+    CONF_EVENT_HYSTERESIS,
+    CONF_EVENT_THRESHOLDS,
+    CONF_EXPIRY_WINDOW,
+    CONF_INACTIVE_SIM_SENSORS,
+    CONF_LOW_DATA_THRESHOLD,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MAX_RETRIES,
+    CONF_MIN_POLL_INTERVAL,
+    CONF_POLL_INTERVAL,
+    CONF_READ_TIMEOUT,
+    CONF_REMAINING_DEADBAND,
+    CONF_REMAINING_DEADBAND_MODE,
+    CONF_SIM_SENSORS,
+    CONF_USAGE_DEADBAND,
+    CONF_USAGE_DEADBAND_MODE,
+    DATA_TOKEN_HANDOFF,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_DAILY_REQUEST_BUDGET,
+    DEFAULT_DEADBAND,
+    DEFAULT_DEADBAND_MODE,
+    DEFAULT_EVENT_EXPIRY_DAYS,
+    DEFAULT_EVENT_HYSTERESIS,
+    DEFAULT_EVENT_THRESHOLDS,
+    DEFAULT_EXPIRY_WINDOW,
+    DEFAULT_LOW_DATA_THRESHOLD,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_READ_TIMEOUT,
+    DOMAIN,
+    SIM_SENSOR_KEYS,
+)
+from .deadband import DEADBAND_MODES
+from .events import parse_levels
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,32 +71,151 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+STEP_REAUTH_DATA_SCHEMA = vol.Schema({vol.Required(CONF_PASSWORD): str})
 
-async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
-    """Validate the user input allows us to connect."""
-    async with aiohttp.ClientSession() as session:
-        payload = {
-            "username": data[CONF_USERNAME],
-            "password": data[CONF_PASSWORD],
+
+@functools.cache
+def _options_schema() -> vol.Schema:
+    """Build the options schema the first time the options flow is shown."""
+    sim_sensor_selector = SelectSelector(
+        SelectSelectorConfig(
+            options=list(SIM_SENSOR_KEYS), multiple=True, translation_key="sim_sensors"
+        )
+    )
+
+    deadband_mode_selector = SelectSelector(
+        SelectSelectorConfig(
+            options=list(DEADBAND_MODES), translation_key="deadband_mode"
+        )
+    )
+
+    event_threshold_selector = SelectSelector(
+        SelectSelectorConfig(
+            options=["50", "25", "10", "5", "0"], multiple=True, custom_value=True
+        )
+    )
+
+    event_expiry_selector = SelectSelector(
+        SelectSelectorConfig(
+            options=["30", "14", "7", "3", "1"], multiple=True, custom_value=True
+        )
+    )
+
+    return vol.Schema(
+        {
+            vol.Optional(CONF_POLL_INTERVAL): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=168)
+            ),
+            vol.Optional(CONF_CONNECT_TIMEOUT, default=DEFAULT_CONNECT_TIMEOUT): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=120)
+            ),
+            vol.Optional(CONF_READ_TIMEOUT, default=DEFAULT_READ_TIMEOUT): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=600)
+            ),
+            vol.Optional(CONF_MAX_RETRIES, default=DEFAULT_MAX_RETRIES): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=10)
+            ),
+            vol.Optional(CONF_ADAPTIVE_POLLING, default=DEFAULT_ADAPTIVE_POLLING): bool,
+            vol.Optional(CONF_MIN_POLL_INTERVAL, default=DEFAULT_MIN_POLL_INTERVAL): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=168)
+            ),
+            vol.Optional(CONF_MAX_POLL_INTERVAL, default=DEFAULT_MAX_POLL_INTERVAL): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=168)
+            ),
+            vol.Optional(
+                CONF_DAILY_REQUEST_BUDGET, default=DEFAULT_DAILY_REQUEST_BUDGET
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=96)),
+            vol.Optional(CONF_LOW_DATA_THRESHOLD, default=DEFAULT_LOW_DATA_THRESHOLD): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=100)
+            ),
+            vol.Optional(CONF_EXPIRY_WINDOW, default=DEFAULT_EXPIRY_WINDOW): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=365)
+            ),
+            vol.Optional(
+                CONF_SIM_SENSORS, default=list(SIM_SENSOR_KEYS)
+            ): sim_sensor_selector,
+            vol.Optional(
+                CONF_INACTIVE_SIM_SENSORS, default=list(SIM_SENSOR_KEYS)
+            ): sim_sensor_selector,
+            vol.Optional(CONF_REMAINING_DEADBAND, default=DEFAULT_DEADBAND): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=1000)
+            ),
+            vol.Optional(
+                CONF_REMAINING_DEADBAND_MODE, default=DEFAULT_DEADBAND_MODE
+            ): deadband_mode_selector,
+            vol.Optional(CONF_USAGE_DEADBAND, default=DEFAULT_DEADBAND): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=100)
+            ),
+            vol.Optional(
+                CONF_USAGE_DEADBAND_MODE, default=DEFAULT_DEADBAND_MODE
+            ): deadband_mode_selector,
+            vol.Optional(
+                CONF_EVENT_THRESHOLDS, default=DEFAULT_EVENT_THRESHOLDS
+            ): event_threshold_selector,
+            vol.Optional(
+                CONF_EVENT_EXPIRY_DAYS, default=DEFAULT_EVENT_EXPIRY_DAYS
+            ): event_expiry_selector,
+            vol.Optional(CONF_EVENT_HYSTERESIS, default=DEFAULT_EVENT_HYSTERESIS): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=50)
+            ),
         }
-        
-        try:
-            async with session.post(LOGIN_URL, json=payload) as response:
-                if response.status == 201:
-                    result = await response.json()
-                    if result.get("result") and "access_token" in result.get("data", {}):
-                        return {"title": f"Grasplet ({data[CONF_USERNAME]})"}
-                else:
-                    _LOGGER.error("Authentication failed with status: %s", response.status)
-                    raise InvalidAuth
-        except aiohttp.ClientError as err:
-            _LOGGER.error("Cannot connect to Grasplet API: %s", err)
-            raise CannotConnect from err
-        except Exception as err:
-            _LOGGER.error("Unexpected error: %s", err)
-            raise CannotConnect from err
+    )
+
+
+async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Validate the user input allows us to connect.
+
+    Returns the entry title and the access token the login produced.
+    """
+    # The API client is imported in the executor once credentials need checking
+    api = await async_import_module(hass, f"{__package__}.api")
+    client = api.GraspletApiClient(
+        async_get_clientsession(hass), data[CONF_USERNAME], data[CONF_PASSWORD]
+    )
     
-    raise InvalidAuth
+    try:
+        await client.async_login()
+    except api.GraspletConnectionError as err:
+        _LOGGER.error("Cannot connect to Grasplet API: %s", err)
+        raise CannotConnect from err
+    except api.GraspletApiError as err:
+        raise InvalidAuth from err
+    except Exception as err:
+        _LOGGER.error("Unexpected error: %s", err)
+        raise CannotConnect from err
+    
+    return {
+        "title": f"Grasplet ({data[CONF_USERNAME]})",
+        "token": {
+            "access_token": client.access_token,
+            "expires_at": client.token_expires_at,
+        },
+    }
+
+
+@callback
+def _async_hand_off_token(
+    hass: HomeAssistant, username: str, token: dict[str, Any]
+) -> None:
+    """Hand the login token to the coordinator so its first refresh skips the login.
+
+    Only called right before an entry is created or updated, so flows that
+    abort or fail leave no token behind.
+    """
+    hass.data.setdefault(DATA_TOKEN_HANDOFF, {})[username] = token
+
+
+def _credentials(data: Mapping[str, Any]) -> tuple[str, str]:
+    """Return the username and password of entry data or user input."""
+    return data[CONF_USERNAME], data[CONF_PASSWORD]
+
+
+def _valid_levels(values: list[str], maximum: float) -> bool:
+    """Return True if every event threshold is a number from 0 to maximum."""
+    try:
+        return all(0 <= level <= maximum for level in parse_levels(values))
+    except ValueError:
+        return False
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -60,6 +223,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -80,6 +251,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 await self.async_set_unique_id(user_input[CONF_USERNAME])
                 self._abort_if_unique_id_configured()
                 
+                _async_hand_off_token(self.hass, user_input[CONF_USERNAME], info["token"])
                 return self.async_create_entry(title=info["title"], data=user_input)
 
         return self.async_show_form(
@@ -93,16 +265,30 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         config_entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
         
         if user_input is not None:
+            info = None
             try:
-                info = await validate_input(self.hass, user_input)
+                # Only log in to check the credentials if they changed
+                if _credentials(user_input) != _credentials(config_entry.data):
+                    info = await validate_input(self.hass, user_input)
             except CannotConnect:
                 return self.async_abort(reason="cannot_connect")
             except InvalidAuth:
                 return self.async_abort(reason="invalid_auth")
             else:
-                return self.async_update_reload_and_abort(
-                    config_entry, data=user_input, reason="reconfigure_successful"
+                if info is not None:
+                    _async_hand_off_token(
+                        self.hass, user_input[CONF_USERNAME], info["token"]
+                    )
+                # Credentials reload the entry; anything else is applied live
+                self.hass.config_entries.async_update_entry(
+                    config_entry,
+                    data=user_input,
+                    options={
+                        **config_entry.options,
+                        CONF_POLL_INTERVAL: user_input[CONF_POLL_INTERVAL],
+                    },
                 )
+                return self.async_abort(reason="reconfigure_successful")
 
         return self.async_show_form(
             step_id="reconfigure",
@@ -111,6 +297,81 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             ),
         )
 
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Handle the API rejecting the stored credentials."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Ask for the account's new password and reload the entry with it."""
+        config_entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        errors: dict[str, str] = {}
+        
+        if user_input is not None:
+            data = {**config_entry.data, CONF_PASSWORD: user_input[CONF_PASSWORD]}
+            try:
+                info = await validate_input(self.hass, data)
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                _async_hand_off_token(self.hass, data[CONF_USERNAME], info["token"])
+                changed = self.hass.config_entries.async_update_entry(config_entry, data=data)
+                # The update listener reloads a loaded entry whose password
+                # changed; reload any other entry here, as polling stopped
+                # when the credentials were rejected
+                if (
+                    not changed
+                    or config_entry.state is not config_entries.ConfigEntryState.LOADED
+                ):
+                    self.hass.config_entries.async_schedule_reload(config_entry.entry_id)
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=STEP_REAUTH_DATA_SCHEMA,
+            description_placeholders={"username": config_entry.data[CONF_USERNAME]},
+            errors=errors,
+        )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle Grasplet options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options, which are applied without reloading."""
+        errors: dict[str, str] = {}
+        
+        if user_input is not None:
+            if user_input[CONF_MIN_POLL_INTERVAL] > user_input[CONF_MAX_POLL_INTERVAL]:
+                errors["base"] = "invalid_poll_bounds"
+            elif not _valid_levels(user_input[CONF_EVENT_THRESHOLDS], 100):
+                errors[CONF_EVENT_THRESHOLDS] = "invalid_event_levels"
+            elif not _valid_levels(user_input[CONF_EVENT_EXPIRY_DAYS], 365):
+                errors[CONF_EVENT_EXPIRY_DAYS] = "invalid_event_levels"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                _options_schema(),
+                user_input
+                or {
+                    CONF_POLL_INTERVAL: self.config_entry.data[CONF_POLL_INTERVAL],
+                    **self.config_entry.options,
+                },
+            ),
+            errors=errors,
+        )
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -6,14 +6,128 @@ DOMAIN = "grasplet"
 CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 CONF_POLL_INTERVAL = "poll_interval"
+CONF_CONNECT_TIMEOUT = "connect_timeout"
+CONF_READ_TIMEOUT = "read_timeout"
+CONF_MAX_RETRIES = "max_retries"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_MIN_POLL_INTERVAL = "min_poll_interval"
+CONF_MAX_POLL_INTERVAL = "max_poll_interval"
+CONF_DAILY_REQUEST_BUDGET = "daily_request_budget"
+CONF_LOW_DATA_THRESHOLD = "low_data_threshold"
+CONF_EXPIRY_WINDOW = "expiry_window"
+CONF_SIM_SENSORS = "sim_sensors"
+CONF_INACTIVE_SIM_SENSORS = "inactive_sim_sensors"
+CONF_REMAINING_DEADBAND = "remaining_deadband"
+CONF_REMAINING_DEADBAND_MODE = "remaining_deadband_mode"
+CONF_USAGE_DEADBAND = "usage_deadband"
+CONF_USAGE_DEADBAND_MODE = "usage_deadband_mode"
+CONF_EVENT_THRESHOLDS = "event_thresholds"
+CONF_EVENT_EXPIRY_DAYS = "event_expiry_days"
+CONF_EVENT_HYSTERESIS = "event_hysteresis"
 
 # Default values
 DEFAULT_POLL_INTERVAL = 24  # hours
+DEFAULT_CONNECT_TIMEOUT = 10  # seconds
+DEFAULT_READ_TIMEOUT = 30  # seconds
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_ADAPTIVE_POLLING = False
+DEFAULT_MIN_POLL_INTERVAL = 1  # hours
+DEFAULT_MAX_POLL_INTERVAL = 168  # hours
+DEFAULT_DAILY_REQUEST_BUDGET = 24
+DEFAULT_LOW_DATA_THRESHOLD = 10  # percent remaining
+DEFAULT_EXPIRY_WINDOW = 7  # days
+DEFAULT_DEADBAND = 0  # publish every change
+DEFAULT_DEADBAND_MODE = "absolute"
+DEFAULT_EVENT_THRESHOLDS = ["25", "10"]  # percent remaining
+DEFAULT_EVENT_EXPIRY_DAYS = ["7", "1"]
+DEFAULT_EVENT_HYSTERESIS = 2  # percentage points
+
+# Per-SIM sensor kinds that can be enabled in the options
+SIM_SENSOR_KEYS: tuple[str, ...] = (
+    "iccid",
+    "status",
+    "plan_name",
+    "expiry_date",
+    "data_limit",
+    "data_remaining",
+    "data_usage_percentage",
+    "availability_zone",
+    "consumption_rate",
+    "data_depletion",
+)
+
+# SIMs with this status use the active sensor set, all others the inactive one
+SIM_STATUS_ACTIVE = "active"
+
+# Adaptive polling thresholds
+LOW_REMAINING_PERCENT = 25
+CRITICAL_REMAINING_PERCENT = 10
+LOW_EXPIRY_HOURS = 72
+CRITICAL_EXPIRY_HOURS = 24
+
+# hass.data key for tokens handed from the config flow to the coordinator
+DATA_TOKEN_HANDOFF = f"{DOMAIN}_token_handoff"
+
+# hass.data key for the poll scheduler shared by all accounts
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+
+# Most API requests in flight at once across all accounts
+MAX_CONCURRENT_REQUESTS = 2
 
 # API URLs
 BASE_URL = "https://data.grasplet.com"
 LOGIN_URL = f"{BASE_URL}/api/auth/login"
 DATA_URL = f"{BASE_URL}/api/sim/all"
 
+# SIM lists at least this large are decoded incrementally, dropping unused fields
+STREAM_DECODE_THRESHOLD = 256 * 1024  # bytes
+STREAM_CHUNK_SIZE = 64 * 1024  # bytes
+
+# Retry backoff (exponential with full jitter)
+RETRY_BACKOFF_BASE = 1  # seconds
+RETRY_BACKOFF_MAX = 30  # seconds
+
+# Pause API requests for CIRCUIT_RESET_TIMEOUT after this many consecutive
+# failed attempts; the next refresh after that is the trial request
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 300  # seconds
+
+# Re-authenticate this long before the access token expires
+TOKEN_REFRESH_MARGIN = 300  # seconds
+
+# Minimum time between on-demand refreshes; extra requests are debounced
+REFRESH_COOLDOWN = 60  # seconds
+
+# Snapshot cache
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.{{entry_id}}"
+STORAGE_SAVE_DELAY = 10  # seconds
+
+# Usage history samples kept per SIM for the consumption forecast
+HISTORY_SAMPLES = 32
+
+# Bus events
+EVENT_THRESHOLD_CROSSED = f"{DOMAIN}_threshold_crossed"
+EVENT_PLAN_EXPIRING = f"{DOMAIN}_plan_expiring"
+
+# Services
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+SERVICE_REFRESH = "refresh"
+SERVICE_EXPORT = "export"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_SIM_ID = "sim_id"
+ATTR_FORMAT = "format"
+ATTR_INCLUDE_HISTORY = "include_history"
+
+# Exports are written to this folder of the config directory, in chunks
+EXPORT_DIRECTORY = "grasplet_exports"
+EXPORT_CHUNK_SIZE = 500  # SIMs
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_JSONL = "jsonl"
+EXPORT_FORMATS: tuple[str, ...] = (EXPORT_FORMAT_CSV, EXPORT_FORMAT_JSONL)
+
+# Number of functions listed in a refresh profile
+PROFILE_TOP_FUNCTIONS = 40
+
 # Device info
 MANUFACTURER = "Grasplet"
\ No newline at end of file
@@ -3,17 +3,76 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from datetime import timedelta
 from typing import Any
 
-import aiohttp
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .const import CONF_POLL_INTERVAL, DATA_URL, DOMAIN, LOGIN_URL
+from .api import (
+    GraspletApiClient,
+    GraspletApiError,
+    GraspletAuthError,
+    GraspletTokenRejected,
+)
+from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_CONNECT_TIMEOUT,
+    CONF_DAILY_REQUEST_BUDGET,
+    CONF_EVENT_EXPIRY_DAYS,
+    CONF_EVENT_HYSTERESIS,
+    CONF_EVENT_THRESHOLDS,
+    CONF_EXPIRY_WINDOW,
+    CONF_LOW_DATA_THRESHOLD,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MAX_RETRIES,
+    CONF_MIN_POLL_INTERVAL,
+    CONF_POLL_INTERVAL,
+    CONF_READ_TIMEOUT,
+    DATA_SCHEDULER,
+    DATA_TOKEN_HANDOFF,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_DAILY_REQUEST_BUDGET,
+    DEFAULT_EVENT_EXPIRY_DAYS,
+    DEFAULT_EVENT_HYSTERESIS,
+    DEFAULT_EVENT_THRESHOLDS,
+    DEFAULT_EXPIRY_WINDOW,
+    DEFAULT_LOW_DATA_THRESHOLD,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DEFAULT_READ_TIMEOUT,
+    DOMAIN,
+    PROFILE_TOP_FUNCTIONS,
+    REFRESH_COOLDOWN,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    TOKEN_REFRESH_MARGIN,
+)
+from .events import SimEventTracker, parse_levels
+from .history import FIELD_CONSUMPTION_RATE, FIELD_DEPLETION, UsageHistory
+from .metrics import (
+    PHASE_DECODE,
+    PHASE_FANOUT,
+    PHASE_FETCH,
+    PHASE_LOGIN,
+    PHASE_PARSE,
+    PHASE_TOTAL,
+    RefreshMetrics,
+)
+from .models import FleetAggregates, GraspletSim, diff_sims, parse_sims
+from .polling import REASON_FIXED, REASON_NORMAL, compute_poll_interval
+from .scheduler import GraspletScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,105 +83,430 @@ class GraspletDataUpdateCoordinator(DataUpdateCoordinator):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
         """Initialize the coordinator."""
         self.entry = entry
-        self._access_token: str | None = None
-        self._session: aiohttp.ClientSession | None = None
+        self.client = GraspletApiClient(
+            async_get_clientsession(hass),
+            entry.data[CONF_USERNAME],
+            entry.data[CONF_PASSWORD],
+            connect_timeout=entry.options.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT),
+            read_timeout=entry.options.get(CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT),
+            max_retries=entry.options.get(CONF_MAX_RETRIES, DEFAULT_MAX_RETRIES),
+            # Accounts share a cap on concurrent API calls
+            semaphore=hass.data[DATA_SCHEDULER].semaphore,
+        )
+        self._changed: set[tuple[str, str]] = set()
+        self._notify_all = True
+        self.added_sims: set[str] = set()
+        self.removed_sims: set[str] = set()
+        # SIMs whose set of sensors may have changed, or None to check them all
+        self.resync_sims: set[str] | None = None
+        self.skipped_writes = 0
+        self.metrics = RefreshMetrics()
+        self.fleet: FleetAggregates | None = None
+        self.history: dict[str, UsageHistory] = {}
+        self._events = self._event_tracker()
+        self.last_profile: str | None = None
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY.format(entry_id=entry.entry_id)
+        )
         
-        update_interval = timedelta(hours=entry.data[CONF_POLL_INTERVAL])
+        update_interval = self._configured_interval()
+        self._base_interval = update_interval
+        # The nominal interval; update_interval holds the delay to this
+        # account's next slot in the shared schedule
+        self.poll_interval = update_interval
+        self._scheduler: GraspletScheduler = hass.data[DATA_SCHEDULER]
+        self._scheduler.register(entry.entry_id)
+        self._adaptive = entry.options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING)
+        self.poll_reason = REASON_FIXED
+        self._refresh_inflight: asyncio.Future[None] | None = None
         
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
             update_interval=update_interval,
+            # On-demand refreshes (services, update_entity) run at most once
+            # per cooldown to protect the API quota
+            request_refresh_debouncer=Debouncer(
+                hass, _LOGGER, cooldown=REFRESH_COOLDOWN, immediate=True
+            ),
         )
 
-    async def _async_setup(self) -> None:
-        """Set up the coordinator."""
-        self._session = aiohttp.ClientSession()
+    def _configured_interval(self) -> timedelta:
+        """Return the poll interval from the options, else from the entry data."""
+        hours = self.entry.options.get(
+            CONF_POLL_INTERVAL, self.entry.data[CONF_POLL_INTERVAL]
+        )
+        return timedelta(hours=hours)
 
-    async def _async_update_data(self) -> dict[str, Any]:
-        """Fetch data from Grasplet API."""
-        if self._session is None:
-            await self._async_setup()
+    def _event_tracker(self) -> SimEventTracker:
+        """Build the event tracker from the options."""
+        options = self.entry.options
+        return SimEventTracker(
+            parse_levels(options.get(CONF_EVENT_THRESHOLDS, DEFAULT_EVENT_THRESHOLDS)),
+            parse_levels(options.get(CONF_EVENT_EXPIRY_DAYS, DEFAULT_EVENT_EXPIRY_DAYS)),
+            options.get(CONF_EVENT_HYSTERESIS, DEFAULT_EVENT_HYSTERESIS),
+        )
+
+    def credentials_changed(self) -> bool:
+        """Return True if the entry's credentials differ from the client's."""
+        data = self.entry.data
+        return self.client.credentials != (data[CONF_USERNAME], data[CONF_PASSWORD])
+
+    @callback
+    def async_apply_options(self) -> None:
+        """Apply changed options to the running coordinator without a reload."""
+        options = self.entry.options
+        self.client.configure(
+            connect_timeout=options.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT),
+            read_timeout=options.get(CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT),
+            max_retries=options.get(CONF_MAX_RETRIES, DEFAULT_MAX_RETRIES),
+        )
+        
+        # Start again from the configured interval; adaptive polling moves
+        # it on from the next refresh
+        self._base_interval = self.poll_interval = self._configured_interval()
+        self._adaptive = options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING)
+        self.poll_reason = REASON_NORMAL if self._adaptive else REASON_FIXED
+        self._schedule_next_poll()
+        self._schedule_refresh()
+        
+        # New thresholds take the current snapshot as their baseline
+        self._events = self._event_tracker()
+        if self.data is not None:
+            self._events.evaluate(self.data, dt_util.utcnow())
+            self.fleet = self._aggregate(self.data)
+        
+        # Account sensors and the SIM entity sync pick up the new options
+        self.resync_sims = None
+        self._changed = set()
+        self._notify_all = False
+        self.async_update_listeners()
+        _LOGGER.debug("Applied options for %s", self.entry.title)
 
+    async def async_load_cache(self) -> bool:
+        """Load the last good snapshot from disk, returning True if found."""
+        cached = await self._store.async_load() or {}
+        
+        # Prefer a token handed over by the config flow, then a persisted one,
+        # so neither a new entry nor a restart needs another login round-trip
+        username = self.entry.data[CONF_USERNAME]
+        token = self.hass.data.get(DATA_TOKEN_HANDOFF, {}).pop(username, None)
+        if token is None and (cached.get("token") or {}).get("username") == username:
+            token = cached["token"]
+        if token:
+            self.client.set_token(token.get("access_token"), token.get("expires_at"))
+        
+        try:
+            self.history = {
+                sim_id: UsageHistory.from_dict(samples)
+                for sim_id, samples in (cached.get("history") or {}).items()
+            }
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.warning("Ignoring invalid Grasplet usage history: %s", err)
+        
+        if not cached.get("sims"):
+            return False
+        
         try:
-            # Authenticate if we don't have a token
-            if not self._access_token:
+            sims = [GraspletSim.from_dict(sim) for sim in cached["sims"]]
+        except (AttributeError, TypeError) as err:
+            _LOGGER.warning("Ignoring invalid Grasplet snapshot cache: %s", err)
+            return False
+        
+        self.data = {sim.sim_id: sim for sim in sims}
+        self.fleet = self._aggregate(self.data)
+        # The cached snapshot is the baseline, so changes while Home
+        # Assistant was stopped still fire on the first refresh
+        self._events.evaluate(self.data, dt_util.utcnow())
+        _LOGGER.debug("Loaded cached snapshot for %d SIMs", len(self.data))
+        return True
+
+    @callback
+    def _data_to_store(self) -> dict[str, Any]:
+        """Return the snapshot and access token to persist."""
+        return {
+            "sims": [sim.as_dict() for sim in (self.data or {}).values()],
+            "history": {
+                sim_id: history.as_dict() for sim_id, history in self.history.items()
+            },
+            "token": {
+                "username": self.entry.data[CONF_USERNAME],
+                "access_token": self.client.access_token,
+                "expires_at": self.client.token_expires_at,
+            },
+        }
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        """Refresh, or wait for the refresh already in flight.
+        
+        Scheduled, requested and first refreshes all pass through here, so
+        overlapping triggers share a single API call. A caller that joins
+        gets the in-flight call's semantics: its own arguments, such as
+        raise_on_auth_failed, are ignored and it sees no exception.
+        """
+        if self._refresh_inflight is not None:
+            self.metrics.coalesced_refreshes += 1
+            await asyncio.shield(self._refresh_inflight)
+            return
+        
+        self._refresh_inflight = self.hass.loop.create_future()
+        try:
+            await super()._async_refresh(*args, **kwargs)
+        finally:
+            self._refresh_inflight.set_result(None)
+            self._refresh_inflight = None
+
+    async def _async_update_data(self) -> dict[str, GraspletSim]:
+        """Fetch data from Grasplet API."""
+        start = time.monotonic()
+        
+        try:
+            # Authenticate if we don't have a token or it is about to expire
+            if not self.client.token_valid(TOKEN_REFRESH_MARGIN):
+                if self.client.access_token:
+                    self.metrics.reauth_count += 1
                 await self._authenticate()
             
-            # Fetch SIM data
-            return await self._fetch_sim_data()
+            # Fetch SIM data, logging in again once if the token was rejected
+            try:
+                sims = await self._async_fetch_sims()
+            except GraspletTokenRejected:
+                _LOGGER.info("Access token rejected, re-authenticating")
+                self.metrics.reauth_count += 1
+                await self._authenticate()
+                sims = await self._async_fetch_sims()
             
-        except aiohttp.ClientError as err:
+        except GraspletApiError as err:
+            self._record_error(err)
             raise UpdateFailed(f"Error communicating with API: {err}") from err
+        except ConfigEntryAuthFailed as err:
+            self._record_error(err)
+            raise
         except Exception as err:
+            self._record_error(err)
             _LOGGER.exception("Unexpected error fetching data")
             raise UpdateFailed(f"Unexpected error: {err}") from err
 
-    async def _authenticate(self) -> None:
-        """Authenticate with Grasplet API."""
-        if self._session is None:
-            raise UpdateFailed("Session not initialized")
-            
-        payload = {
-            "username": self.entry.data[CONF_USERNAME],
-            "password": self.entry.data[CONF_PASSWORD],
+        if sims is None:
+            # Unchanged since the last poll: nothing to decode, parse or fan out
+            return self._keep_snapshot(start)
+        
+        # Normalize once and drop the raw payload
+        parse_start = time.monotonic()
+        try:
+            data = parse_sims(sims)
+        except (AttributeError, KeyError, TypeError, ValueError) as err:
+            # Make sure the same payload is not skipped as unchanged next time
+            self.client.reset_validators()
+            self._record_error(err)
+            raise UpdateFailed(f"Invalid SIM data: {err}") from err
+        del sims
+        
+        # Entities only need a state write when their field changed, unless
+        # there is no previous snapshot or they were marked unavailable
+        self._notify_all = self.data is None or not self.last_update_success
+        self._changed = set() if self._notify_all else diff_sims(self.data, data)
+        
+        # SIMs provisioned or deleted since the last snapshot
+        previous = self.data.keys() if self.data else set()
+        self.added_sims = data.keys() - previous
+        self.removed_sims = previous - data.keys()
+        # New SIMs and SIMs whose status moved may need different sensors
+        self.resync_sims = None if self._notify_all else {
+            sim_id for sim_id, field in self._changed if field == "status" and sim_id in data
         }
+        history_changed = self._update_history(data)
+        if not self._notify_all:
+            self._changed |= history_changed
+        self.fleet = self._aggregate(data)
+        self._fire_events(data)
+        self.metrics.record(PHASE_PARSE, time.monotonic() - parse_start)
         
-        # Mask password in logs
-        _LOGGER.debug("Authenticating with username: %s", payload["username"])
+        if self._adaptive:
+            self._adapt_interval(data)
+        self._schedule_next_poll()
         
-        try:
-            async with self._session.post(LOGIN_URL, json=payload) as response:
-                if response.status == 201:
-                    result = await response.json()
-                    if result.get("result") and "access_token" in result.get("data", {}):
-                        self._access_token = result["data"]["access_token"]
-                        _LOGGER.debug("Authentication successful")
-                        return
-                
-                _LOGGER.error("Authentication failed with status: %s", response.status)
-                if response.status == 401:
-                    raise ConfigEntryAuthFailed("Invalid credentials")
-                raise UpdateFailed(f"Authentication failed: {response.status}")
-                
-        except aiohttp.ClientError as err:
-            _LOGGER.error("Network error during authentication: %s", err)
-            raise UpdateFailed(f"Authentication failed: {err}") from err
-
-    async def _fetch_sim_data(self) -> dict[str, Any]:
-        """Fetch SIM data from Grasplet API."""
-        if not self._access_token:
-            raise UpdateFailed("No access token available")
+        # Persist once the base class has published the new snapshot
+        self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+        
+        self.metrics.record(PHASE_TOTAL, time.monotonic() - start)
+        return data
+
+    def _keep_snapshot(self, start: float) -> dict[str, GraspletSim]:
+        """Finish a refresh whose payload matched the current snapshot."""
+        self.metrics.unchanged_refreshes += 1
+        self._notify_all = not self.last_update_success
+        self.added_sims = set()
+        self.removed_sims = set()
+        self.resync_sims = set()
+        # Idle SIMs still get a sample, so their consumption rate falls
+        # towards zero instead of repeating the last non-zero rate
+        self._changed = self._update_history(self.data)
+        # Plans still move closer to expiry while the data stays the same
+        self._fire_events(self.data)
+        
+        if self._adaptive:
+            self._adapt_interval(self.data)
+        self._schedule_next_poll()
+        
+        self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+        self.metrics.record(PHASE_TOTAL, time.monotonic() - start)
+        return self.data
+
+    async def _async_fetch_sims(self) -> list[dict[str, Any]] | None:
+        """Fetch the raw SIM list, or None if unchanged, timing download and decode."""
+        start = time.monotonic()
+        sims = await self.client.async_get_sims()
+        decode_time = self.client.last_decode_time or 0.0
+        self.metrics.record(PHASE_FETCH, time.monotonic() - start - decode_time)
+        self.metrics.record(PHASE_DECODE, decode_time)
+        self.metrics.payload_bytes = self.client.last_response_bytes
+        return sims
+
+    def _record_error(self, err: Exception) -> None:
+        """Remember the last refresh error for diagnostics."""
+        self.metrics.last_error = f"{err.__class__.__name__}: {err}"
+        self.metrics.last_error_at = dt_util.utcnow().isoformat()
+
+    def _update_history(self, data: dict[str, GraspletSim]) -> set[tuple[str, str]]:
+        """Add each SIM's remaining data to its history, returning changed fields."""
+        now = time.time()
+        changed: set[tuple[str, str]] = set()
+        
+        for sim_id in self.removed_sims:
+            self.history.pop(sim_id, None)
+        
+        for sim_id, sim in data.items():
+            if sim.data_remaining is None:
+                continue
+            if (history := self.history.get(sim_id)) is None:
+                history = self.history[sim_id] = UsageHistory()
             
-        if self._session is None:
-            raise UpdateFailed("Session not initialized")
+            rate = history.rate
+            depletion = history.depletion_timestamp()
+            history.append(now, sim.data_remaining)
+            if history.rate != rate:
+                changed.add((sim_id, FIELD_CONSUMPTION_RATE))
+            if history.depletion_timestamp() != depletion:
+                changed.add((sim_id, FIELD_DEPLETION))
+        
+        return changed
+
+    def _fire_events(self, data: dict[str, GraspletSim]) -> None:
+        """Fire bus events for SIMs that crossed a threshold since the last snapshot."""
+        for event_type, event_data in self._events.evaluate(data, dt_util.utcnow()):
+            _LOGGER.debug("Firing %s for SIM %s", event_type, event_data["sim_id"])
+            self.hass.bus.async_fire(
+                event_type, {"config_entry_id": self.entry.entry_id, **event_data}
+            )
+
+    def _aggregate(self, data: dict[str, GraspletSim]) -> FleetAggregates:
+        """Compute the account-wide aggregates for a snapshot."""
+        options = self.entry.options
+        return FleetAggregates(
+            data,
+            now=dt_util.utcnow(),
+            low_data_threshold=options.get(
+                CONF_LOW_DATA_THRESHOLD, DEFAULT_LOW_DATA_THRESHOLD
+            ),
+            expiry_window=timedelta(
+                days=options.get(CONF_EXPIRY_WINDOW, DEFAULT_EXPIRY_WINDOW)
+            ),
+        )
+
+    def _adapt_interval(self, data: dict[str, GraspletSim]) -> None:
+        """Move the poll interval towards what the new snapshot needs."""
+        options = self.entry.options
+        interval, self.poll_reason = compute_poll_interval(
+            data,
+            self.data,
+            now=dt_util.utcnow(),
+            current=self.poll_interval,
+            base=self._base_interval,
+            minimum=timedelta(
+                hours=options.get(CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL)
+            ),
+            maximum=timedelta(
+                hours=options.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL)
+            ),
+            daily_budget=options.get(CONF_DAILY_REQUEST_BUDGET, DEFAULT_DAILY_REQUEST_BUDGET),
+        )
+        if interval != self.poll_interval:
+            _LOGGER.debug("Poll interval set to %s (%s)", interval, self.poll_reason)
+        self.poll_interval = interval
+
+    def _schedule_next_poll(self) -> None:
+        """Line the next poll up with this account's slot in the shared schedule."""
+        # The base class schedules the next refresh from this after the update
+        self.update_interval = self._scheduler.delay(
+            self.entry.entry_id, self.poll_interval, time.time()
+        )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify listeners whose SIM field changed in the last refresh."""
+        start = time.monotonic()
+        
+        if self._notify_all or not self.last_update_success:
+            super().async_update_listeners()
+        else:
+            # Listeners with a (SIM id, field) context are skipped if unchanged
+            pending = [
+                update_callback
+                for update_callback, context in list(self._listeners.values())
+                if context is None or context in self._changed
+            ]
+            self.skipped_writes += len(self._listeners) - len(pending)
             
-        headers = {"Authorization": f"Bearer {self._access_token}"}
+            for update_callback in pending:
+                update_callback()
         
+        self.metrics.record(PHASE_FANOUT, time.monotonic() - start)
+
+    async def _authenticate(self) -> None:
+        """Log in and persist the new access token."""
+        start = time.monotonic()
         try:
-            async with self._session.get(DATA_URL, headers=headers) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    if result.get("result") and "data" in result:
-                        _LOGGER.debug("Successfully fetched data for %d SIMs", len(result["data"]))
-                        return result["data"]
-                
-                if response.status == 401:
-                    # Token expired, clear it and try to re-authenticate
-                    self._access_token = None
-                    _LOGGER.info("Access token expired, will re-authenticate on next update")
-                    raise UpdateFailed("Access token expired")
-                
-                _LOGGER.error("Failed to fetch SIM data with status: %s", response.status)
-                raise UpdateFailed(f"Failed to fetch data: {response.status}")
-                
-        except aiohttp.ClientError as err:
-            _LOGGER.error("Network error fetching SIM data: %s", err)
-            raise UpdateFailed(f"Failed to fetch data: {err}") from err
+            await self.client.async_login()
+        except GraspletAuthError as err:
+            raise ConfigEntryAuthFailed("Invalid credentials") from err
+        finally:
+            self.metrics.record(PHASE_LOGIN, time.monotonic() - start)
+        self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+
+    async def async_profile_refresh(self) -> str:
+        """Run one refresh under cProfile and keep the report for diagnostics.
+
+        The profiler sees everything the event loop runs while the refresh is
+        in flight, so other integrations may show up in the report.
+        """
+        import cProfile
+        import io
+        import pstats
+
+        # Joining a refresh already in flight would profile only its tail,
+        # so wait for it and then run a refresh of our own
+        while self._refresh_inflight is not None:
+            await asyncio.shield(self._refresh_inflight)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await self.async_refresh()
+        finally:
+            profiler.disable()
+        
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_TOP_FUNCTIONS)
+        self.last_profile = stream.getvalue()
+        _LOGGER.info("Profile of %s refresh:\n%s", self.entry.title, self.last_profile)
+        return self.last_profile
 
     async def async_shutdown(self) -> None:
-        """Close the session when shutting down."""
-        if self._session:
-            await self._session.close()
-            self._session = None
\ No newline at end of file
+        """Stop refreshing and flush the snapshot cache."""
+        await super().async_shutdown()
+        self._scheduler.unregister(self.entry.entry_id)
+        if self.data:
+            await self._store.async_save(self._data_to_store())
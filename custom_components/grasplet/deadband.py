@@ -0,0 +1,33 @@
+"""Deadband filtering of Grasplet sensor states."""
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable
+
+# How a deadband is measured against the last published value
+DEADBAND_ABSOLUTE = "absolute"
+DEADBAND_RELATIVE = "relative"  # percent of the published value
+
+DEADBAND_MODES: tuple[str, ...] = (DEADBAND_ABSOLUTE, DEADBAND_RELATIVE)
+
+
+def outside_deadband(
+    published: float | None, value: float | None, band: float, mode: str
+) -> bool:
+    """Return True if value has moved far enough from the published value."""
+    if published is None or value is None:
+        return published != value
+    limit = band if mode == DEADBAND_ABSOLUTE else abs(published) * band / 100
+    delta = abs(value - published)
+    if limit <= 0:
+        return delta > 0
+    return delta >= limit or math.isclose(delta, limit)
+
+
+def crosses_threshold(
+    old: float | None, new: float | None, thresholds: Iterable[float]
+) -> bool:
+    """Return True if a level moved to the other side of any threshold."""
+    if old is None or new is None:
+        return old != new
+    return any((old <= threshold) != (new <= threshold) for threshold in thresholds)
@@ -0,0 +1,62 @@
+"""Diagnostics support for the Grasplet integration."""
+from __future__ import annotations
+
+from itertools import islice
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import GraspletDataUpdateCoordinator
+
+# Number of parsed SIM records included as a sample
+SIM_SAMPLE_SIZE = 5
+
+TO_REDACT = {
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    "access_token",
+    "iccid",
+    "title",
+    "unique_id",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: GraspletDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    client = coordinator.client
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "refresh": {
+            "last_update_success": coordinator.last_update_success,
+            "poll_interval": str(coordinator.poll_interval),
+            "next_poll_in": str(coordinator.update_interval),
+            "poll_reason": coordinator.poll_reason,
+            "sim_count": len(coordinator.data or {}),
+            "skipped_writes": coordinator.skipped_writes,
+            "metrics": coordinator.metrics.as_dict(),
+        },
+        "api": {
+            "attempts": client.attempts,
+            "retries": client.retries,
+            "failures": client.failures,
+            "last_latency": client.last_latency,
+            "total_latency": client.total_latency,
+            "circuit_breaker": client.breaker.state,
+            "token_expires_at": client.token_expires_at,
+        },
+        "sim_sample": [
+            async_redact_data(sim.as_dict(), TO_REDACT)
+            for sim in islice((coordinator.data or {}).values(), SIM_SAMPLE_SIZE)
+        ],
+        "profile": coordinator.last_profile,
+    }
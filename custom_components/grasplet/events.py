@@ -0,0 +1,125 @@
+"""Threshold and plan expiry events for the Grasplet integration."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from typing import Any
+
+from .const import EVENT_PLAN_EXPIRING, EVENT_THRESHOLD_CROSSED
+from .models import GraspletSim
+
+DIRECTION_BELOW = "below"
+DIRECTION_ABOVE = "above"
+
+
+def parse_levels(values: Iterable[str | float]) -> tuple[float, ...]:
+    """Parse option values into distinct levels, highest first."""
+    return tuple(sorted({float(value) for value in values}, reverse=True))
+
+
+class SimEventTracker:
+    """Turn each snapshot into events for SIMs that crossed a threshold.
+
+    Only transitions fire. A SIM is below a remaining-data threshold once
+    its remaining share drops to it, and only counts as recovered once it
+    rises above the threshold plus the hysteresis. Expiry thresholds fire
+    once per plan expiry date. SIMs seen for the first time set a baseline
+    without firing.
+    """
+
+    def __init__(
+        self,
+        thresholds: Iterable[float],
+        expiry_days: Iterable[float],
+        hysteresis: float,
+    ) -> None:
+        """Initialize the tracker."""
+        self._thresholds = tuple(thresholds)
+        self._expiry_days = tuple(expiry_days)
+        self._hysteresis = hysteresis
+        # Thresholds each SIM is currently below
+        self._below: dict[str, set[float]] = {}
+        # Expiry date of each SIM's plan and the day thresholds already fired
+        self._expiring: dict[str, tuple[datetime | None, set[float]]] = {}
+
+    def evaluate(
+        self, data: dict[str, GraspletSim], now: datetime
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """Update the state from a snapshot, returning the events to fire."""
+        events: list[tuple[str, dict[str, Any]]] = []
+
+        for sim_id, sim in data.items():
+            level = (
+                100 - sim.usage_percentage if sim.usage_percentage is not None else None
+            )
+            below = self._below.get(sim_id)
+            if below is None:
+                self._below[sim_id] = {
+                    threshold
+                    for threshold in self._thresholds
+                    if level is not None and level <= threshold
+                }
+            elif level is not None:
+                for threshold in self._thresholds:
+                    if threshold not in below and level <= threshold:
+                        below.add(threshold)
+                        direction = DIRECTION_BELOW
+                    elif threshold in below and level > threshold + self._hysteresis:
+                        below.discard(threshold)
+                        direction = DIRECTION_ABOVE
+                    else:
+                        continue
+                    events.append(
+                        (
+                            EVENT_THRESHOLD_CROSSED,
+                            {
+                                "sim_id": sim_id,
+                                "name": sim.name,
+                                "threshold": threshold,
+                                "direction": direction,
+                                "remaining_percent": round(level, 2),
+                                "data_remaining": sim.data_remaining,
+                            },
+                        )
+                    )
+
+            due = self._due(sim.expiry_date, now)
+            previous = self._expiring.get(sim_id)
+            if previous is None:
+                self._expiring[sim_id] = (sim.expiry_date, due)
+                continue
+            expiry_date, fired = previous
+            if expiry_date != sim.expiry_date:
+                # Renewed or changed plan: its thresholds start over
+                fired = set()
+                self._expiring[sim_id] = (sim.expiry_date, fired)
+            if new := due - fired:
+                fired |= new
+                events.append(
+                    (
+                        EVENT_PLAN_EXPIRING,
+                        {
+                            "sim_id": sim_id,
+                            "name": sim.name,
+                            "days": min(new),
+                            "expiry_date": sim.expiry_date.isoformat(),
+                            "hours_remaining": round(
+                                (sim.expiry_date - now) / timedelta(hours=1), 1
+                            ),
+                        },
+                    )
+                )
+
+        for sim_id in self._below.keys() - data.keys():
+            del self._below[sim_id]
+        for sim_id in self._expiring.keys() - data.keys():
+            del self._expiring[sim_id]
+
+        return events
+
+    def _due(self, expiry_date: datetime | None, now: datetime) -> set[float]:
+        """Return the day thresholds the plan expiry is within."""
+        if expiry_date is None:
+            return set()
+        left = expiry_date - now
+        return {days for days in self._expiry_days if left <= timedelta(days=days)}
@@ -0,0 +1,153 @@
+"""Fleet snapshot export for the Grasplet integration."""
+from __future__ import annotations
+
+import csv
+import json
+import os
+from typing import TYPE_CHECKING, Any, TextIO
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import EXPORT_CHUNK_SIZE, EXPORT_DIRECTORY, EXPORT_FORMAT_CSV
+from .history import UsageHistory
+from .models import GraspletSim
+
+if TYPE_CHECKING:
+    from .coordinator import GraspletDataUpdateCoordinator
+
+EXPORT_FIELDS: tuple[str, ...] = (
+    "sim_id",
+    "name",
+    "iccid",
+    "status",
+    "plan_name",
+    "expiry_date",
+    "data_limit",
+    "data_remaining",
+    "usage_percentage",
+    "availability_zone",
+    "consumption_rate",
+    "depletion",
+)
+
+HISTORY_FIELDS: tuple[str, ...] = ("sim_id", "timestamp", "data_remaining")
+
+
+class _ExportFile:
+    """Blocking writer for one export file, only used in the executor."""
+
+    def __init__(self, path: str, fieldnames: tuple[str, ...] | None) -> None:
+        """Create the file, with a header row for CSV."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file: TextIO = open(path, "w", newline="", encoding="utf-8")
+        self._csv: csv.DictWriter | None = None
+        if fieldnames is not None:
+            self._csv = csv.DictWriter(self._file, fieldnames)
+            try:
+                self._csv.writeheader()
+            except OSError:
+                self._file.close()
+                raise
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        """Append a chunk of rows."""
+        if self._csv is not None:
+            self._csv.writerows(rows)
+        else:
+            self._file.writelines(f"{json.dumps(row)}\n" for row in rows)
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+def _sim_row(sim: GraspletSim, history: UsageHistory | None) -> dict[str, Any]:
+    """Return the export row of one SIM."""
+    depletion = history.depletion_timestamp() if history else None
+    return {
+        **sim.as_dict(),
+        "usage_percentage": sim.usage_percentage,
+        "consumption_rate": history.rate if history else None,
+        "depletion": (
+            dt_util.utc_from_timestamp(depletion).isoformat()
+            if depletion is not None
+            else None
+        ),
+    }
+
+
+def _history_rows(sim_id: str, history: UsageHistory) -> list[dict[str, Any]]:
+    """Return one CSV row per history sample of a SIM."""
+    samples = history.as_dict()
+    return [
+        {
+            "sim_id": sim_id,
+            "timestamp": dt_util.utc_from_timestamp(timestamp).isoformat(),
+            "data_remaining": remaining,
+        }
+        for timestamp, remaining in zip(samples["t"], samples["r"])
+    ]
+
+
+async def async_export(
+    hass: HomeAssistant,
+    coordinator: GraspletDataUpdateCoordinator,
+    export_format: str,
+    include_history: bool,
+) -> dict[str, Any]:
+    """Write the coordinator's snapshot to a file under the config directory.
+
+    Rows are built and written a chunk at a time, with all file access in
+    the executor, so memory use does not grow with the fleet.
+    """
+    stamp = dt_util.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    base = hass.config.path(EXPORT_DIRECTORY, f"{coordinator.entry.entry_id}_{stamp}")
+    path = f"{base}.{export_format}"
+    is_csv = export_format == EXPORT_FORMAT_CSV
+    # CSV keeps one row per SIM, so history samples go to a file of their own
+    history_path = f"{base}_history.csv" if is_csv and include_history else None
+
+    # Copy the references only; the records are never modified in place
+    sims = list((coordinator.data or {}).values())
+    histories = coordinator.history
+
+    files: list[_ExportFile] = []
+    try:
+        # Opened inside the try so a failure on the second file closes the first
+        files.append(
+            await hass.async_add_executor_job(
+                _ExportFile, path, EXPORT_FIELDS if is_csv else None
+            )
+        )
+        if history_path is not None:
+            files.append(
+                await hass.async_add_executor_job(
+                    _ExportFile, history_path, HISTORY_FIELDS
+                )
+            )
+
+        for start in range(0, len(sims), EXPORT_CHUNK_SIZE):
+            chunk = sims[start : start + EXPORT_CHUNK_SIZE]
+            rows = []
+            history_rows = []
+            for sim in chunk:
+                history = histories.get(sim.sim_id)
+                row = _sim_row(sim, history)
+                if include_history and history is not None:
+                    if is_csv:
+                        history_rows.extend(_history_rows(sim.sim_id, history))
+                    else:
+                        row["history"] = _history_rows(sim.sim_id, history)
+                rows.append(row)
+            await hass.async_add_executor_job(files[0].write, rows)
+            if history_path is not None:
+                await hass.async_add_executor_job(files[1].write, history_rows)
+    finally:
+        for export_file in files:
+            await hass.async_add_executor_job(export_file.close)
+
+    result: dict[str, Any] = {"path": path, "rows": len(sims)}
+    if history_path is not None:
+        result["history_path"] = history_path
+    return result
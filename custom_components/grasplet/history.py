@@ -0,0 +1,97 @@
+"""Per-SIM usage history for the Grasplet integration."""
+from __future__ import annotations
+
+from array import array
+from typing import Any
+
+from .const import HISTORY_SAMPLES
+
+SECONDS_PER_DAY = 86400
+
+# Entity fields derived from the history, used for change tracking
+FIELD_CONSUMPTION_RATE = "consumption_rate"
+FIELD_DEPLETION = "depletion"
+
+
+class UsageHistory:
+    """Ring buffer of (timestamp, remaining GB) samples for one SIM.
+
+    The consumption rate is taken between the oldest and newest sample in
+    the buffer, so adding a sample and reading the rate are both O(1).
+    """
+
+    __slots__ = ("_timestamps", "_remaining", "_start", "_size", "rate")
+
+    def __init__(self, capacity: int = HISTORY_SAMPLES) -> None:
+        """Initialize an empty buffer."""
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._remaining = array("d", bytes(8 * capacity))
+        self._start = 0
+        self._size = 0
+        # Consumption rate in GB per day, None until two samples span time
+        self.rate: float | None = None
+
+    def __len__(self) -> int:
+        """Return the number of samples held."""
+        return self._size
+
+    def _index(self, offset: int) -> int:
+        """Return the buffer index of the sample at offset from the oldest."""
+        return (self._start + offset) % len(self._timestamps)
+
+    def append(self, timestamp: float, remaining: float) -> None:
+        """Add a sample and update the consumption rate."""
+        if self._size:
+            newest = self._index(self._size - 1)
+            if timestamp <= self._timestamps[newest]:
+                return
+            if remaining > self._remaining[newest]:
+                # Topped up or renewed; usage before this is not comparable
+                self._start = self._size = 0
+
+        capacity = len(self._timestamps)
+        if self._size < capacity:
+            index = self._index(self._size)
+            self._size += 1
+        else:
+            # Full: overwrite the oldest sample
+            index = self._start
+            self._start = (self._start + 1) % capacity
+        self._timestamps[index] = timestamp
+        self._remaining[index] = remaining
+
+        self.rate = self._compute_rate()
+
+    def _compute_rate(self) -> float | None:
+        """Return GB used per day between the oldest and newest samples."""
+        if self._size < 2:
+            return None
+        oldest = self._start
+        newest = self._index(self._size - 1)
+        elapsed = self._timestamps[newest] - self._timestamps[oldest]
+        used = self._remaining[oldest] - self._remaining[newest]
+        return used / elapsed * SECONDS_PER_DAY
+
+    def depletion_timestamp(self) -> float | None:
+        """Return when the remaining data runs out at the current rate."""
+        if not self.rate or self.rate <= 0:
+            return None
+        newest = self._index(self._size - 1)
+        days_left = self._remaining[newest] / self.rate
+        return self._timestamps[newest] + days_left * SECONDS_PER_DAY
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the samples, oldest first, for storage."""
+        indexes = [self._index(offset) for offset in range(self._size)]
+        return {
+            "t": [self._timestamps[index] for index in indexes],
+            "r": [self._remaining[index] for index in indexes],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> UsageHistory:
+        """Restore a buffer saved with as_dict."""
+        history = cls()
+        for timestamp, remaining in zip(data["t"], data["r"]):
+            history.append(float(timestamp), float(remaining))
+        return history
@@ -0,0 +1,99 @@
+"""Refresh instrumentation for the Grasplet integration."""
+from __future__ import annotations
+
+from typing import Any
+
+# Histogram bucket upper bounds in seconds
+BUCKET_BOUNDS: tuple[float, ...] = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Phases of a refresh that are timed
+PHASE_LOGIN = "login"
+PHASE_FETCH = "fetch"
+PHASE_DECODE = "decode"
+PHASE_PARSE = "parse"
+PHASE_FANOUT = "fanout"
+PHASE_TOTAL = "total"
+
+PHASES: tuple[str, ...] = (
+    PHASE_LOGIN,
+    PHASE_FETCH,
+    PHASE_DECODE,
+    PHASE_PARSE,
+    PHASE_FANOUT,
+    PHASE_TOTAL,
+)
+
+
+class PhaseHistogram:
+    """Fixed-bucket histogram of durations for one refresh phase."""
+
+    __slots__ = ("buckets", "count", "total", "last", "max")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        # One extra bucket for durations above the last bound
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.last: float | None = None
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add one duration."""
+        for index, bound in enumerate(BUCKET_BOUNDS):
+            if seconds <= bound:
+                break
+        else:
+            index = len(BUCKET_BOUNDS)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram for diagnostics."""
+        labels = [f"<={bound}s" for bound in BUCKET_BOUNDS] + [f">{BUCKET_BOUNDS[-1]}s"]
+        return {
+            "count": self.count,
+            "last": self.last,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else None,
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class RefreshMetrics:
+    """Timings and counters collected across coordinator refreshes."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.phases = {phase: PhaseHistogram() for phase in PHASES}
+        self.payload_bytes: int | None = None
+        self.reauth_count = 0
+        self.unchanged_refreshes = 0
+        self.coalesced_refreshes = 0
+        self.deadband_suppressed = 0
+        self.last_error: str | None = None
+        self.last_error_at: str | None = None
+
+    def record(self, phase: str, seconds: float) -> None:
+        """Record the duration of a refresh phase."""
+        self.phases[phase].record(seconds)
+
+    def last(self, phase: str) -> float | None:
+        """Return the most recent duration of a phase."""
+        return self.phases[phase].last
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for diagnostics."""
+        return {
+            "phases": {phase: histogram.as_dict() for phase, histogram in self.phases.items()},
+            "payload_bytes": self.payload_bytes,
+            "reauth_count": self.reauth_count,
+            "unchanged_refreshes": self.unchanged_refreshes,
+            "coalesced_refreshes": self.coalesced_refreshes,
+            "deadband_suppressed": self.deadband_suppressed,
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at,
+        }
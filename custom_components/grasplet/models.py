@@ -0,0 +1,273 @@
+"""Data models for the Grasplet integration."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# Divisors to normalize API data units to GB
+UNIT_DIVISORS: dict[str, int] = {
+    "GB": 1,
+    "MB": 1024,
+    "KB": 1024 * 1024,
+}
+
+
+def normalize_to_gb(value: Any, unit: str | None) -> float:
+    """Convert a data amount in the given unit to GB."""
+    divisor = UNIT_DIVISORS.get((unit or "GB").upper(), 1)  # Assume GB
+    return float(value) / divisor
+
+
+def parse_expiry(value: str | None) -> datetime | None:
+    """Parse an API expiry date string."""
+    if not value:
+        return None
+    try:
+        expiry = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        _LOGGER.warning("Failed to parse expiry date: %s", value)
+        return None
+    # Timestamps without an offset are taken to be UTC
+    return expiry if expiry.tzinfo else expiry.replace(tzinfo=timezone.utc)
+
+
+# Record fields that back an entity state
+SIM_FIELDS: tuple[str, ...] = (
+    "iccid",
+    "status",
+    "plan_name",
+    "expiry_date",
+    "data_limit",
+    "data_remaining",
+    "usage_percentage",
+    "availability_zone",
+)
+
+
+class GraspletSim:
+    """Normalized state of a single SIM, parsed once per refresh."""
+
+    __slots__ = (
+        "sim_id",
+        "name",
+        "iccid",
+        "status",
+        "plan_name",
+        "expiry_date",
+        "data_limit",
+        "data_remaining",
+        "usage_percentage",
+        "availability_zone",
+    )
+
+    def __init__(
+        self,
+        *,
+        sim_id: str,
+        name: str,
+        iccid: str | None = None,
+        status: str | None = None,
+        plan_name: str | None = None,
+        expiry_date: datetime | None = None,
+        data_limit: float | None = None,
+        data_remaining: float | None = None,
+        availability_zone: str | None = None,
+    ) -> None:
+        """Initialize the SIM record and derive the usage percentage."""
+        self.sim_id = sim_id
+        self.name = name
+        self.iccid = iccid
+        self.status = status
+        self.plan_name = plan_name
+        self.expiry_date = expiry_date
+        self.data_limit = data_limit
+        self.data_remaining = data_remaining
+        self.availability_zone = availability_zone
+        self.usage_percentage = _usage_percentage(data_limit, data_remaining)
+
+    @classmethod
+    def from_api(cls, sim: dict[str, Any]) -> GraspletSim:
+        """Build a record from one entry of the /api/sim/all response."""
+        sim_id = str(sim["id"])
+        plan_details = sim.get("PlanUsageDetails")
+        plan_data = plan_details[0] if plan_details else {}
+        plan = plan_data.get("plan") or {}
+        usage = plan_data.get("usage") or {}
+
+        data_limit = plan.get("dataLimit")
+        data_remaining = usage.get("data")
+
+        return cls(
+            sim_id=sim_id,
+            name=(sim.get("name") or f"SIM {sim_id}").strip(),
+            iccid=sim.get("iccid"),
+            status=sim.get("status"),
+            plan_name=plan.get("planName"),
+            expiry_date=parse_expiry(plan.get("expiryDate")),
+            data_limit=float(data_limit) if data_limit is not None else None,
+            data_remaining=(
+                normalize_to_gb(data_remaining, usage.get("dataUnit"))
+                if data_remaining is not None
+                else None
+            ),
+            availability_zone=usage.get("availabilityZone"),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation for storage."""
+        data = {field: getattr(self, field) for field in _STORED_FIELDS}
+        if self.expiry_date is not None:
+            data["expiry_date"] = self.expiry_date.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> GraspletSim:
+        """Restore a record saved with as_dict."""
+        values = {field: data.get(field) for field in _STORED_FIELDS}
+        values["expiry_date"] = parse_expiry(data.get("expiry_date"))
+        return cls(**values)
+
+
+# Constructor fields persisted in the snapshot cache
+_STORED_FIELDS: tuple[str, ...] = (
+    "sim_id",
+    "name",
+    "iccid",
+    "status",
+    "plan_name",
+    "expiry_date",
+    "data_limit",
+    "data_remaining",
+    "availability_zone",
+)
+
+
+def _usage_percentage(
+    data_limit: float | None, data_remaining: float | None
+) -> float | None:
+    """Return the percentage of the data limit that has been used."""
+    if data_limit is None or data_remaining is None:
+        return None
+
+    used = data_limit - data_remaining
+    if data_limit > 0 and used >= 0:
+        return min(100.0, (used / data_limit) * 100)
+    return None
+
+
+def diff_sims(
+    old: dict[str, GraspletSim] | None, new: dict[str, GraspletSim]
+) -> set[tuple[str, str]]:
+    """Return the (SIM id, field) pairs whose value differs between snapshots."""
+    changed: set[tuple[str, str]] = set()
+    previous = old or {}
+
+    for sim_id, sim in new.items():
+        old_sim = previous.get(sim_id)
+        if old_sim is None:
+            changed.update((sim_id, field) for field in SIM_FIELDS)
+            continue
+        for field in SIM_FIELDS:
+            if getattr(sim, field) != getattr(old_sim, field):
+                changed.add((sim_id, field))
+
+    # SIMs that disappeared need their entities refreshed too
+    for sim_id in previous.keys() - new.keys():
+        changed.update((sim_id, field) for field in SIM_FIELDS)
+
+    return changed
+
+
+# Keys on the path to every field from_api reads, at any depth of a SIM
+API_SIM_KEYS: frozenset[str] = frozenset(
+    (
+        "id",
+        "name",
+        "iccid",
+        "status",
+        "PlanUsageDetails",
+        "plan",
+        "usage",
+        "dataLimit",
+        "planName",
+        "expiryDate",
+        "data",
+        "dataUnit",
+        "availabilityZone",
+    )
+)
+
+
+def parse_sims(sims: list[dict[str, Any]]) -> dict[str, GraspletSim]:
+    """Parse the raw SIM list into records keyed by SIM id."""
+    records: dict[str, GraspletSim] = {}
+    for sim in sims:
+        record = GraspletSim.from_api(sim)
+        records[record.sim_id] = record
+    return records
+
+
+class FleetAggregates:
+    """Account-wide totals computed once per refresh."""
+
+    __slots__ = (
+        "sim_count",
+        "total_data_limit",
+        "total_data_remaining",
+        "mean_usage_percentage",
+        "max_usage_percentage",
+        "low_data_count",
+        "expiring_count",
+    )
+
+    def __init__(
+        self,
+        data: dict[str, GraspletSim],
+        *,
+        now: datetime,
+        low_data_threshold: float,
+        expiry_window: timedelta,
+    ) -> None:
+        """Aggregate the fleet in a single pass over the SIM records.
+
+        A SIM is low on data when its remaining share of the limit is at or
+        below low_data_threshold percent, and expiring when its plan ends
+        within expiry_window from now.
+        """
+        total_limit = 0.0
+        total_remaining = 0.0
+        usage_total = 0.0
+        usage_count = 0
+        usage_max: float | None = None
+        low_data = 0
+        expiring = 0
+        usage_cutoff = 100 - low_data_threshold
+        expiry_cutoff = now + expiry_window
+
+        for sim in data.values():
+            if sim.data_limit is not None:
+                total_limit += sim.data_limit
+            if sim.data_remaining is not None:
+                total_remaining += sim.data_remaining
+            usage = sim.usage_percentage
+            if usage is not None:
+                usage_total += usage
+                usage_count += 1
+                if usage_max is None or usage > usage_max:
+                    usage_max = usage
+                if usage >= usage_cutoff:
+                    low_data += 1
+            expiry = sim.expiry_date
+            if expiry is not None and now <= expiry <= expiry_cutoff:
+                expiring += 1
+
+        self.sim_count = len(data)
+        self.total_data_limit = total_limit
+        self.total_data_remaining = total_remaining
+        self.mean_usage_percentage = usage_total / usage_count if usage_count else None
+        self.max_usage_percentage = usage_max
+        self.low_data_count = low_data
+        self.expiring_count = expiring
@@ -0,0 +1,77 @@
+"""Adaptive poll interval for the Grasplet integration."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from .const import (
+    CRITICAL_EXPIRY_HOURS,
+    CRITICAL_REMAINING_PERCENT,
+    LOW_EXPIRY_HOURS,
+    LOW_REMAINING_PERCENT,
+)
+from .models import GraspletSim
+
+# Reasons reported for the chosen interval
+REASON_FIXED = "fixed"
+REASON_NORMAL = "normal"
+REASON_IDLE = "idle"
+REASON_DATA_LOW = "data_low"
+REASON_DATA_CRITICAL = "data_critical"
+REASON_EXPIRY_SOON = "expiry_soon"
+REASON_EXPIRY_IMMINENT = "expiry_imminent"
+
+
+def compute_poll_interval(
+    data: dict[str, GraspletSim],
+    previous: dict[str, GraspletSim] | None,
+    *,
+    now: datetime,
+    current: timedelta,
+    base: timedelta,
+    minimum: timedelta,
+    maximum: timedelta,
+    daily_budget: int,
+) -> tuple[timedelta, str]:
+    """Pick the next poll interval for the fleet and the reason for it.
+
+    The interval shortens as the emptiest SIM runs low on data or the
+    nearest plan expiry approaches, and doubles while no SIM's remaining
+    data moves. It never drops below what the daily request budget allows.
+    """
+    floor = max(minimum, timedelta(days=1) / max(daily_budget, 1))
+    ceiling = max(maximum, floor)
+
+    min_remaining: float | None = None
+    min_expiry: datetime | None = None
+    flat = previous is not None
+
+    for sim_id, sim in data.items():
+        if sim.usage_percentage is not None:
+            remaining = 100 - sim.usage_percentage
+            if min_remaining is None or remaining < min_remaining:
+                min_remaining = remaining
+        if sim.expiry_date is not None and sim.expiry_date > now:
+            if min_expiry is None or sim.expiry_date < min_expiry:
+                min_expiry = sim.expiry_date
+        if flat:
+            old_sim = previous.get(sim_id)
+            flat = old_sim is not None and old_sim.data_remaining == sim.data_remaining
+
+    hours_to_expiry = (
+        (min_expiry - now) / timedelta(hours=1) if min_expiry is not None else None
+    )
+
+    if min_remaining is not None and min_remaining <= CRITICAL_REMAINING_PERCENT:
+        interval, reason = floor, REASON_DATA_CRITICAL
+    elif hours_to_expiry is not None and hours_to_expiry <= CRITICAL_EXPIRY_HOURS:
+        interval, reason = floor, REASON_EXPIRY_IMMINENT
+    elif min_remaining is not None and min_remaining <= LOW_REMAINING_PERCENT:
+        interval, reason = base / 4, REASON_DATA_LOW
+    elif hours_to_expiry is not None and hours_to_expiry <= LOW_EXPIRY_HOURS:
+        interval, reason = base / 4, REASON_EXPIRY_SOON
+    elif flat:
+        interval, reason = max(current, base) * 2, REASON_IDLE
+    else:
+        interval, reason = base, REASON_NORMAL
+
+    return min(max(interval, floor), ceiling), reason
@@ -0,0 +1,59 @@
+"""Poll scheduling shared by all Grasplet accounts."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from itertools import count
+
+from .const import MAX_CONCURRENT_REQUESTS
+
+
+def _spread(index: int) -> float:
+    """Return the index-th point of the base-2 van der Corput sequence.
+
+    The points 0, 1/2, 1/4, 3/4, 1/8, ... stay evenly spread over [0, 1)
+    however many have been handed out.
+    """
+    fraction = 0.0
+    denominator = 1
+    while index:
+        denominator *= 2
+        index, bit = divmod(index, 2)
+        fraction += bit / denominator
+    return fraction
+
+
+class GraspletScheduler:
+    """Spread account polls over the poll interval and cap concurrent API calls."""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_REQUESTS) -> None:
+        """Initialize the scheduler."""
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self._slots: dict[str, int] = {}
+
+    def register(self, entry_id: str) -> None:
+        """Give an account the lowest free poll slot."""
+        if entry_id in self._slots:
+            return
+        used = set(self._slots.values())
+        self._slots[entry_id] = next(slot for slot in count() if slot not in used)
+
+    def unregister(self, entry_id: str) -> None:
+        """Free an account's poll slot."""
+        self._slots.pop(entry_id, None)
+
+    def phase(self, entry_id: str) -> float:
+        """Return where in each interval the account polls, as a fraction."""
+        return _spread(self._slots.get(entry_id, 0))
+
+    def delay(self, entry_id: str, interval: timedelta, now: float) -> timedelta:
+        """Return the delay from now (epoch seconds) to the account's next slot.
+
+        Slots are aligned to the wall clock so accounts sharing an interval
+        stay apart. The delay is between half and one and a half intervals.
+        """
+        period = interval.total_seconds()
+        delay = (self.phase(entry_id) * period - now) % period
+        if delay < period / 2:
+            delay += period
+        return timedelta(seconds=delay)
@@ -2,27 +2,169 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfInformation
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, MANUFACTURER
+from .const import (
+    CONF_EVENT_THRESHOLDS,
+    CONF_INACTIVE_SIM_SENSORS,
+    CONF_LOW_DATA_THRESHOLD,
+    CONF_REMAINING_DEADBAND,
+    CONF_REMAINING_DEADBAND_MODE,
+    CONF_SIM_SENSORS,
+    CONF_USAGE_DEADBAND,
+    CONF_USAGE_DEADBAND_MODE,
+    CRITICAL_REMAINING_PERCENT,
+    DEFAULT_DEADBAND,
+    DEFAULT_DEADBAND_MODE,
+    DEFAULT_EVENT_THRESHOLDS,
+    DEFAULT_LOW_DATA_THRESHOLD,
+    DOMAIN,
+    LOW_REMAINING_PERCENT,
+    MANUFACTURER,
+    SIM_SENSOR_KEYS,
+    SIM_STATUS_ACTIVE,
+)
 from .coordinator import GraspletDataUpdateCoordinator
+from .deadband import crosses_threshold, outside_deadband
+from .events import parse_levels
+from .history import FIELD_CONSUMPTION_RATE, FIELD_DEPLETION, UsageHistory
+from .metrics import PHASE_TOTAL, PHASES
+from .models import GraspletSim
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class GraspletSensorEntityDescription(SensorEntityDescription):
+    """Describes a per-SIM Grasplet sensor."""
+    
+    # Coordinator change-tracking field backing the state
+    field: str
+    value_fn: Callable[[GraspletSim, UsageHistory | None], StateType | datetime]
+    # Option keys of the deadband size and mode, for noisy numeric sensors
+    deadband: tuple[str, str] | None = None
+
+
+def _depletion(sim: GraspletSim, history: UsageHistory | None) -> datetime | None:
+    """Return when the remaining data runs out at the current rate."""
+    timestamp = history.depletion_timestamp() if history else None
+    return dt_util.utc_from_timestamp(timestamp) if timestamp is not None else None
+
+
+# Keys double as unique id suffixes, so they must not change
+SIM_SENSORS: tuple[GraspletSensorEntityDescription, ...] = (
+    GraspletSensorEntityDescription(
+        key="iccid",
+        name="ICCID",
+        icon="mdi:sim",
+        field="iccid",
+        value_fn=lambda sim, history: sim.iccid,
+    ),
+    GraspletSensorEntityDescription(
+        key="status",
+        name="Status",
+        icon="mdi:signal",
+        field="status",
+        value_fn=lambda sim, history: sim.status,
+    ),
+    GraspletSensorEntityDescription(
+        key="plan_name",
+        name="Plan",
+        icon="mdi:package-variant",
+        field="plan_name",
+        value_fn=lambda sim, history: sim.plan_name,
+    ),
+    GraspletSensorEntityDescription(
+        key="expiry_date",
+        name="Expiry Date",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        icon="mdi:calendar-clock",
+        field="expiry_date",
+        value_fn=lambda sim, history: sim.expiry_date,
+    ),
+    GraspletSensorEntityDescription(
+        key="data_limit",
+        name="Data Limit",
+        native_unit_of_measurement=UnitOfInformation.GIGABYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL,
+        icon="mdi:database",
+        field="data_limit",
+        value_fn=lambda sim, history: sim.data_limit,
+    ),
+    GraspletSensorEntityDescription(
+        key="data_remaining",
+        name="Data Remaining",
+        native_unit_of_measurement=UnitOfInformation.GIGABYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=3,
+        icon="mdi:download",
+        field="data_remaining",
+        value_fn=lambda sim, history: sim.data_remaining,
+        deadband=(CONF_REMAINING_DEADBAND, CONF_REMAINING_DEADBAND_MODE),
+    ),
+    GraspletSensorEntityDescription(
+        key="data_usage_percentage",
+        name="Data Usage %",
+        native_unit_of_measurement="%",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        icon="mdi:gauge",
+        field="usage_percentage",
+        value_fn=lambda sim, history: sim.usage_percentage,
+        deadband=(CONF_USAGE_DEADBAND, CONF_USAGE_DEADBAND_MODE),
+    ),
+    GraspletSensorEntityDescription(
+        key="availability_zone",
+        name="Availability Zone",
+        icon="mdi:earth",
+        field="availability_zone",
+        value_fn=lambda sim, history: sim.availability_zone,
+    ),
+    GraspletSensorEntityDescription(
+        key="consumption_rate",
+        name="Consumption Rate",
+        native_unit_of_measurement="GB/d",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        icon="mdi:speedometer",
+        field=FIELD_CONSUMPTION_RATE,
+        value_fn=lambda sim, history: history.rate if history else None,
+    ),
+    GraspletSensorEntityDescription(
+        key="data_depletion",
+        name="Data Depletion",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        icon="mdi:calendar-end",
+        field=FIELD_DEPLETION,
+        value_fn=_depletion,
+    ),
+)
+
+SIM_SENSORS_BY_KEY = {description.key: description for description in SIM_SENSORS}
+ALL_SIM_SENSOR_KEYS = frozenset(SIM_SENSORS_BY_KEY)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -30,261 +172,487 @@ async def async_setup_entry(
 ) -> None:
     """Set up Grasplet sensor entities."""
     coordinator: GraspletDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    entity_registry = er.async_get(hass)
+    device_registry = dr.async_get(hass)
+    # Sensor keys created so far, by SIM; SIMs here have a device
+    known: dict[str, set[str]] = {}
     
-    entities = []
+    @callback
+    def _async_detach(sim_ids: set[str]) -> None:
+        """Detach SIM devices from the entry, which removes their entities."""
+        for sim_id in sim_ids:
+            if device := device_registry.async_get_device(identifiers={(DOMAIN, sim_id)}):
+                device_registry.async_update_device(
+                    device.id, remove_config_entry_id=config_entry.entry_id
+                )
     
-    if coordinator.data:
-        for sim_data in coordinator.data:
-            sim_id = str(sim_data["id"])
-            sim_name = sim_data.get("name", f"SIM {sim_id}").strip()
+    @callback
+    def _async_sync(sim_ids: Iterable[str], initial: bool = False) -> None:
+        """Create and remove entities so the given SIMs match the options.
+        
+        On the initial sync every sensor kind a SIM does not want is removed
+        from the entity registry, in case it was disabled since the last setup.
+        """
+        # Read on every sync so option changes apply without a reload
+        options = config_entry.options
+        active_keys = set(options.get(CONF_SIM_SENSORS, SIM_SENSOR_KEYS))
+        inactive_keys = set(options.get(CONF_INACTIVE_SIM_SENSORS, SIM_SENSOR_KEYS))
+        entities: list[GraspletSimSensor] = []
+        detached: set[str] = set()
+        
+        for sim_id in sim_ids:
+            sim = coordinator.data[sim_id]
+            wanted = (
+                active_keys
+                if (sim.status or "").lower() == SIM_STATUS_ACTIVE
+                else inactive_keys
+            )
+            have = known.get(sim_id, set())
+            for key in (ALL_SIM_SENSOR_KEYS if initial else have) - wanted:
+                if entity_id := entity_registry.async_get_entity_id(
+                    "sensor", DOMAIN, f"{sim_id}_{key}"
+                ):
+                    entity_registry.async_remove(entity_id)
+            entities.extend(
+                GraspletSimSensor(coordinator, sim, SIM_SENSORS_BY_KEY[key])
+                for key in wanted - have
+            )
             
-            # Create entities for each SIM
-            entities.extend([
-                GraspletICCIDSensor(coordinator, sim_data, sim_id, sim_name),
-                GraspletStatusSensor(coordinator, sim_data, sim_id, sim_name),
-                GraspletPlanNameSensor(coordinator, sim_data, sim_id, sim_name),
-                GraspletExpiryDateSensor(coordinator, sim_data, sim_id, sim_name),
-                GraspletDataLimitSensor(coordinator, sim_data, sim_id, sim_name),
-                GraspletDataRemainingSensor(coordinator, sim_data, sim_id, sim_name),
-                GraspletDataUsagePercentageSensor(coordinator, sim_data, sim_id, sim_name),
-                GraspletAvailabilityZoneSensor(coordinator, sim_data, sim_id, sim_name),
-            ])
+            if wanted:
+                known[sim_id] = set(wanted)
+            elif initial or known.pop(sim_id, None) is not None:
+                # No sensors left, so the device would be an empty orphan
+                detached.add(sim_id)
+        
+        if detached:
+            _async_detach(detached)
+        if entities:
+            async_add_entities(entities)
+    
+    @callback
+    def _async_sync_sims() -> None:
+        """Apply the SIMs, SIM statuses and options changed since the last sync."""
+        if not coordinator.last_update_success:
+            return
+        if removed := coordinator.removed_sims & known.keys():
+            for sim_id in removed:
+                del known[sim_id]
+            _async_detach(removed)
+        # Only new SIMs and SIMs whose status changed, unless options changed
+        sim_ids = coordinator.resync_sims
+        _async_sync(coordinator.data if sim_ids is None else sim_ids)
     
-    async_add_entities(entities)
+    async_add_entities([
+        GraspletFleetDataLimitSensor(coordinator),
+        GraspletFleetDataRemainingSensor(coordinator),
+        GraspletFleetMeanUsageSensor(coordinator),
+        GraspletFleetMaxUsageSensor(coordinator),
+        GraspletFleetLowDataSensor(coordinator),
+        GraspletFleetExpiringSensor(coordinator),
+        GraspletSkippedWritesSensor(coordinator),
+        GraspletPollIntervalSensor(coordinator),
+        GraspletRefreshDurationSensor(coordinator),
+        GraspletPayloadSizeSensor(coordinator),
+        GraspletReauthCountSensor(coordinator),
+        GraspletUnchangedRefreshesSensor(coordinator),
+        GraspletLastErrorSensor(coordinator),
+    ])
+    
+    if coordinator.data:
+        _async_sync(coordinator.data, initial=True)
+    
+    config_entry.async_on_unload(coordinator.async_add_listener(_async_sync_sims))
+
 
+def _remaining_level(sim: GraspletSim) -> float | None:
+    """Return the share of the data limit left, in percent."""
+    return 100 - sim.usage_percentage if sim.usage_percentage is not None else None
 
-class GraspletSensorBase(CoordinatorEntity, SensorEntity):
-    """Base class for Grasplet sensors."""
+
+class GraspletSimSensor(CoordinatorEntity, SensorEntity):
+    """Sensor for one field of a Grasplet SIM.
+    
+    Sensors with a deadband only publish a new value once it has moved far
+    enough from the last published one, or when the SIM crosses a low data
+    or event threshold or its plan expiry changes.
+    """
+    
+    entity_description: GraspletSensorEntityDescription
     
     def __init__(
         self,
         coordinator: GraspletDataUpdateCoordinator,
-        sim_data: dict[str, Any],
-        sim_id: str,
-        sim_name: str,
+        sim: GraspletSim,
+        description: GraspletSensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
-        self._sim_id = sim_id
-        self._sim_name = sim_name
+        # Coordinator only notifies us when this field of this SIM changes
+        super().__init__(coordinator, context=(sim.sim_id, description.field))
+        self.entity_description = description
+        self._sim_id = sim.sim_id
+        self._sim_name = sim.name
+        self._attr_name = f"{sim.name} {description.name}"
+        self._attr_unique_id = f"{sim.sim_id}_{description.key}"
         self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, sim_id)},
-            name=sim_name,
+            identifiers={(DOMAIN, sim.sim_id)},
+            name=sim.name,
             manufacturer=MANUFACTURER,
             model="Data SIM",
             sw_version="1.0",
         )
+        
+        # Last published state, compared against when a deadband applies
+        self._attr_native_value = self._value(sim)
+        self._published_level = _remaining_level(sim)
+        self._published_expiry = sim.expiry_date
+        self._published_available = True
 
     @property
-    def sim_data(self) -> dict[str, Any] | None:
-        """Get the current SIM data."""
+    def sim(self) -> GraspletSim | None:
+        """Get the current SIM record."""
         if not self.coordinator.data:
             return None
-            
-        for sim in self.coordinator.data:
-            if str(sim["id"]) == self._sim_id:
-                return sim
-        return None
+        return self.coordinator.data.get(self._sim_id)
+
+    def _value(self, sim: GraspletSim | None) -> StateType | datetime:
+        """Return the sensor value for a SIM record."""
+        if sim is None:
+            return None
+        return self.entity_description.value_fn(
+            sim, self.coordinator.history.get(self._sim_id)
+        )
+
+    def _within_deadband(self, sim: GraspletSim, value: StateType | datetime) -> bool:
+        """Return True if the new value need not be published."""
+        # Options are read per update so changes apply without a reload
+        options = self.coordinator.entry.options
+        band_key, mode_key = self.entity_description.deadband
+        band = options.get(band_key, DEFAULT_DEADBAND)
+        if band <= 0:
+            return False
+        thresholds = (
+            0,
+            CRITICAL_REMAINING_PERCENT,
+            LOW_REMAINING_PERCENT,
+            options.get(CONF_LOW_DATA_THRESHOLD, DEFAULT_LOW_DATA_THRESHOLD),
+            *parse_levels(options.get(CONF_EVENT_THRESHOLDS, DEFAULT_EVENT_THRESHOLDS)),
+        )
+        return not (
+            outside_deadband(
+                self._attr_native_value,
+                value,
+                band,
+                options.get(mode_key, DEFAULT_DEADBAND_MODE),
+            )
+            or crosses_threshold(self._published_level, _remaining_level(sim), thresholds)
+            or sim.expiry_date != self._published_expiry
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Publish the SIM's new value unless it is inside the deadband."""
+        sim = self.sim
+        value = self._value(sim)
+        if (
+            self.entity_description.deadband is not None
+            and sim is not None
+            and self._published_available
+            and self.available
+            and self._within_deadband(sim, value)
+        ):
+            self.coordinator.metrics.deadband_suppressed += 1
+            return
+        
+        self._attr_native_value = value
+        if sim is not None:
+            self._published_level = _remaining_level(sim)
+            self._published_expiry = sim.expiry_date
+        self._published_available = self.available
+        self.async_write_ha_state()
+
+
+class GraspletAccountSensorBase(CoordinatorEntity, SensorEntity):
+    """Base class for sensors describing the Grasplet account."""
+    
+    def __init__(self, coordinator: GraspletDataUpdateCoordinator) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        entry = coordinator.entry
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title,
+            manufacturer=MANUFACTURER,
+            model="Account",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+
+class GraspletFleetDataLimitSensor(GraspletAccountSensorBase):
+    """Total data limit across all SIMs."""
+    
+    def __init__(self, coordinator):
+        """Initialize the fleet data limit sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} Total Data Limit"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_total_data_limit"
+        self._attr_native_unit_of_measurement = UnitOfInformation.GIGABYTES
+        self._attr_device_class = SensorDeviceClass.DATA_SIZE
+        self._attr_state_class = SensorStateClass.TOTAL
+        self._attr_icon = "mdi:database"
 
     @property
-    def plan_data(self) -> dict[str, Any] | None:
-        """Get the plan data for this SIM."""
-        sim = self.sim_data
-        if sim and sim.get("PlanUsageDetails"):
-            return sim["PlanUsageDetails"][0]
-        return None
+    def native_value(self) -> float | None:
+        """Return the total data limit in GB."""
+        fleet = self.coordinator.fleet
+        return fleet.total_data_limit if fleet else None
 
 
-class GraspletICCIDSensor(GraspletSensorBase):
-    """ICCID sensor."""
+class GraspletFleetDataRemainingSensor(GraspletAccountSensorBase):
+    """Total data remaining across all SIMs."""
     
-    def __init__(self, coordinator, sim_data, sim_id, sim_name):
-        """Initialize the ICCID sensor."""
-        super().__init__(coordinator, sim_data, sim_id, sim_name)
-        self._attr_name = f"{sim_name} ICCID"
-        self._attr_unique_id = f"{sim_id}_iccid"
-        self._attr_icon = "mdi:sim"
+    def __init__(self, coordinator):
+        """Initialize the fleet data remaining sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} Total Data Remaining"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_total_data_remaining"
+        self._attr_native_unit_of_measurement = UnitOfInformation.GIGABYTES
+        self._attr_device_class = SensorDeviceClass.DATA_SIZE
+        self._attr_state_class = SensorStateClass.TOTAL
+        self._attr_suggested_display_precision = 3
+        self._attr_icon = "mdi:download"
 
     @property
-    def native_value(self) -> str | None:
-        """Return the ICCID."""
-        sim = self.sim_data
-        return sim.get("iccid") if sim else None
+    def native_value(self) -> float | None:
+        """Return the total data remaining in GB."""
+        fleet = self.coordinator.fleet
+        return fleet.total_data_remaining if fleet else None
 
 
-class GraspletStatusSensor(GraspletSensorBase):
-    """Status sensor."""
+class GraspletFleetMeanUsageSensor(GraspletAccountSensorBase):
+    """Mean data usage percentage across all SIMs."""
     
-    def __init__(self, coordinator, sim_data, sim_id, sim_name):
-        """Initialize the status sensor."""
-        super().__init__(coordinator, sim_data, sim_id, sim_name)
-        self._attr_name = f"{sim_name} Status"
-        self._attr_unique_id = f"{sim_id}_status"
-        self._attr_icon = "mdi:signal"
+    def __init__(self, coordinator):
+        """Initialize the mean usage sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} Mean Data Usage %"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_mean_data_usage_percentage"
+        self._attr_native_unit_of_measurement = "%"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_suggested_display_precision = 1
+        self._attr_icon = "mdi:gauge"
 
     @property
-    def native_value(self) -> str | None:
-        """Return the status."""
-        sim = self.sim_data
-        return sim.get("status") if sim else None
+    def native_value(self) -> float | None:
+        """Return the mean data usage percentage."""
+        fleet = self.coordinator.fleet
+        return fleet.mean_usage_percentage if fleet else None
 
 
-class GraspletPlanNameSensor(GraspletSensorBase):
-    """Plan name sensor."""
+class GraspletFleetMaxUsageSensor(GraspletAccountSensorBase):
+    """Highest data usage percentage of any SIM."""
     
-    def __init__(self, coordinator, sim_data, sim_id, sim_name):
-        """Initialize the plan name sensor."""
-        super().__init__(coordinator, sim_data, sim_id, sim_name)
-        self._attr_name = f"{sim_name} Plan"
-        self._attr_unique_id = f"{sim_id}_plan_name"
-        self._attr_icon = "mdi:package-variant"
+    def __init__(self, coordinator):
+        """Initialize the max usage sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} Max Data Usage %"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_max_data_usage_percentage"
+        self._attr_native_unit_of_measurement = "%"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_suggested_display_precision = 1
+        self._attr_icon = "mdi:gauge-full"
 
     @property
-    def native_value(self) -> str | None:
-        """Return the plan name."""
-        plan_data = self.plan_data
-        if plan_data and "plan" in plan_data:
-            return plan_data["plan"].get("planName")
-        return None
+    def native_value(self) -> float | None:
+        """Return the highest data usage percentage."""
+        fleet = self.coordinator.fleet
+        return fleet.max_usage_percentage if fleet else None
 
 
-class GraspletExpiryDateSensor(GraspletSensorBase):
-    """Expiry date sensor."""
+class GraspletFleetLowDataSensor(GraspletAccountSensorBase):
+    """Number of SIMs at or below the low data threshold."""
     
-    def __init__(self, coordinator, sim_data, sim_id, sim_name):
-        """Initialize the expiry date sensor."""
-        super().__init__(coordinator, sim_data, sim_id, sim_name)
-        self._attr_name = f"{sim_name} Expiry Date"
-        self._attr_unique_id = f"{sim_id}_expiry_date"
-        self._attr_device_class = SensorDeviceClass.TIMESTAMP
-        self._attr_icon = "mdi:calendar-clock"
+    def __init__(self, coordinator):
+        """Initialize the low data count sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} SIMs Low on Data"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_low_data_count"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_icon = "mdi:sim-alert"
 
     @property
-    def native_value(self) -> datetime | None:
-        """Return the expiry date."""
-        plan_data = self.plan_data
-        if plan_data and "plan" in plan_data:
-            expiry_str = plan_data["plan"].get("expiryDate")
-            if expiry_str:
-                try:
-                    return datetime.fromisoformat(expiry_str.replace("Z", "+00:00"))
-                except ValueError:
-                    _LOGGER.warning("Failed to parse expiry date: %s", expiry_str)
-        return None
-
-
-class GraspletDataLimitSensor(GraspletSensorBase):
-    """Data limit sensor."""
+    def native_value(self) -> int | None:
+        """Return the number of SIMs low on data."""
+        fleet = self.coordinator.fleet
+        return fleet.low_data_count if fleet else None
+
+
+class GraspletFleetExpiringSensor(GraspletAccountSensorBase):
+    """Number of SIMs whose plan expires within the expiry window."""
     
-    def __init__(self, coordinator, sim_data, sim_id, sim_name):
-        """Initialize the data limit sensor."""
-        super().__init__(coordinator, sim_data, sim_id, sim_name)
-        self._attr_name = f"{sim_name} Data Limit"
-        self._attr_unique_id = f"{sim_id}_data_limit"
-        self._attr_native_unit_of_measurement = UnitOfInformation.GIGABYTES
-        self._attr_device_class = SensorDeviceClass.DATA_SIZE
-        self._attr_state_class = SensorStateClass.TOTAL
-        self._attr_icon = "mdi:database"
+    def __init__(self, coordinator):
+        """Initialize the expiring count sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} SIMs Expiring Soon"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_expiring_count"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_icon = "mdi:calendar-alert"
 
     @property
-    def native_value(self) -> float | None:
-        """Return the data limit in GB."""
-        plan_data = self.plan_data
-        if plan_data and "plan" in plan_data:
-            data_limit = plan_data["plan"].get("dataLimit")
-            if data_limit is not None:
-                return float(data_limit)
-        return None
+    def native_value(self) -> int | None:
+        """Return the number of SIMs expiring soon."""
+        fleet = self.coordinator.fleet
+        return fleet.expiring_count if fleet else None
 
 
-class GraspletDataRemainingSensor(GraspletSensorBase):
-    """Data remaining sensor."""
+class GraspletSkippedWritesSensor(GraspletAccountSensorBase):
+    """Count of state writes skipped because the SIM field did not change."""
     
-    def __init__(self, coordinator, sim_data, sim_id, sim_name):
-        """Initialize the data remaining sensor."""
-        super().__init__(coordinator, sim_data, sim_id, sim_name)
-        self._attr_name = f"{sim_name} Data Remaining"
-        self._attr_unique_id = f"{sim_id}_data_remaining"
-        self._attr_native_unit_of_measurement = UnitOfInformation.GIGABYTES
-        self._attr_device_class = SensorDeviceClass.DATA_SIZE
-        self._attr_state_class = SensorStateClass.TOTAL
-        self._attr_suggested_display_precision = 3
-        self._attr_icon = "mdi:download"
+    def __init__(self, coordinator):
+        """Initialize the skipped writes sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} Skipped State Writes"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_skipped_writes"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        self._attr_icon = "mdi:content-save-off"
 
     @property
-    def native_value(self) -> float | None:
-        """Return the data remaining in GB."""
-        plan_data = self.plan_data
-        if plan_data and "usage" in plan_data:
-            data_remaining = plan_data["usage"].get("data")
-            data_unit = plan_data["usage"].get("dataUnit", "GB")
-            
-            if data_remaining is not None:
-                # Normalize to GB
-                if data_unit.upper() == "MB":
-                    return float(data_remaining) / 1024
-                elif data_unit.upper() == "KB":
-                    return float(data_remaining) / (1024 * 1024)
-                else:  # Assume GB
-                    return float(data_remaining)
-        return None
-
-
-class GraspletAvailabilityZoneSensor(GraspletSensorBase):
-    """Availability zone sensor."""
+    def native_value(self) -> int:
+        """Return the number of skipped state writes."""
+        return self.coordinator.skipped_writes
+
+
+class GraspletPollIntervalSensor(GraspletAccountSensorBase):
+    """Current poll interval and why it was chosen."""
     
-    def __init__(self, coordinator, sim_data, sim_id, sim_name):
-        """Initialize the availability zone sensor."""
-        super().__init__(coordinator, sim_data, sim_id, sim_name)
-        self._attr_name = f"{sim_name} Availability Zone"
-        self._attr_unique_id = f"{sim_id}_availability_zone"
-        self._attr_icon = "mdi:earth"
+    def __init__(self, coordinator):
+        """Initialize the poll interval sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} Poll Interval"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_poll_interval"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_device_class = SensorDeviceClass.DURATION
+        self._attr_native_unit_of_measurement = UnitOfTime.HOURS
+        self._attr_suggested_display_precision = 1
+        self._attr_icon = "mdi:timer-sync"
 
     @property
-    def native_value(self) -> str | None:
-        """Return the availability zone."""
-        plan_data = self.plan_data
-        if plan_data and "usage" in plan_data:
-            return plan_data["usage"].get("availabilityZone")
-        return None
+    def native_value(self) -> float:
+        """Return the poll interval in hours."""
+        return self.coordinator.poll_interval.total_seconds() / 3600
+
+    @property
+    def extra_state_attributes(self) -> dict[str, str]:
+        """Return the reason for the current interval."""
+        return {"reason": self.coordinator.poll_reason}
 
 
-class GraspletDataUsagePercentageSensor(GraspletSensorBase):
-    """Data usage percentage sensor."""
+class GraspletRefreshDurationSensor(GraspletAccountSensorBase):
+    """Duration of the last refresh, with a per-phase breakdown."""
     
-    def __init__(self, coordinator, sim_data, sim_id, sim_name):
-        """Initialize the data usage percentage sensor."""
-        super().__init__(coordinator, sim_data, sim_id, sim_name)
-        self._attr_name = f"{sim_name} Data Usage %"
-        self._attr_unique_id = f"{sim_id}_data_usage_percentage"
-        self._attr_native_unit_of_measurement = "%"
+    def __init__(self, coordinator):
+        """Initialize the refresh duration sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} Refresh Duration"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_refresh_duration"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_device_class = SensorDeviceClass.DURATION
+        self._attr_native_unit_of_measurement = UnitOfTime.SECONDS
         self._attr_state_class = SensorStateClass.MEASUREMENT
-        self._attr_icon = "mdi:gauge"
-        self._attr_suggested_display_precision = 1
+        self._attr_suggested_display_precision = 3
+        self._attr_icon = "mdi:timer-outline"
 
     @property
     def native_value(self) -> float | None:
-        """Return the data usage percentage."""
-        plan_data = self.plan_data
-        if plan_data and "plan" in plan_data and "usage" in plan_data:
-            data_limit = plan_data["plan"].get("dataLimit")
-            data_remaining = plan_data["usage"].get("data")
-            data_unit = plan_data["usage"].get("dataUnit", "GB")
-            
-            if data_limit is not None and data_remaining is not None:
-                # Normalize both to GB
-                limit_gb = float(data_limit)
-                remaining_gb = float(data_remaining)
-                
-                # Normalize remaining data to GB if needed
-                if data_unit.upper() == "MB":
-                    remaining_gb = remaining_gb / 1024
-                elif data_unit.upper() == "KB":
-                    remaining_gb = remaining_gb / (1024 * 1024)
-                
-                # Calculate used data
-                used_gb = limit_gb - remaining_gb
-                
-                if limit_gb > 0 and used_gb >= 0:
-                    return min(100.0, (used_gb / limit_gb) * 100)
-        return None
\ No newline at end of file
+        """Return the duration of the last successful refresh."""
+        return self.coordinator.metrics.last(PHASE_TOTAL)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, float | None]:
+        """Return the last duration of each phase."""
+        metrics = self.coordinator.metrics
+        return {phase: metrics.last(phase) for phase in PHASES if phase != PHASE_TOTAL}
+
+
+class GraspletPayloadSizeSensor(GraspletAccountSensorBase):
+    """Size of the last SIM list response."""
+    
+    def __init__(self, coordinator):
+        """Initialize the payload size sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} Payload Size"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_payload_size"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_device_class = SensorDeviceClass.DATA_SIZE
+        self._attr_native_unit_of_measurement = UnitOfInformation.BYTES
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_icon = "mdi:file-download-outline"
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the payload size in bytes."""
+        return self.coordinator.metrics.payload_bytes
+
+
+class GraspletReauthCountSensor(GraspletAccountSensorBase):
+    """Number of times the access token had to be renewed."""
+    
+    def __init__(self, coordinator):
+        """Initialize the re-authentication count sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} Re-authentications"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_reauth_count"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        self._attr_icon = "mdi:key-change"
+
+    @property
+    def native_value(self) -> int:
+        """Return the re-authentication count."""
+        return self.coordinator.metrics.reauth_count
+
+
+class GraspletUnchangedRefreshesSensor(GraspletAccountSensorBase):
+    """Number of refreshes skipped because the SIM list had not changed."""
+    
+    def __init__(self, coordinator):
+        """Initialize the unchanged refreshes sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} Unchanged Refreshes"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_unchanged_refreshes"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        self._attr_icon = "mdi:cached"
+
+    @property
+    def native_value(self) -> int:
+        """Return the unchanged refresh count."""
+        return self.coordinator.metrics.unchanged_refreshes
+
+
+class GraspletLastErrorSensor(GraspletAccountSensorBase):
+    """Most recent refresh error."""
+    
+    def __init__(self, coordinator):
+        """Initialize the last error sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} Last Error"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_last_error"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_icon = "mdi:alert-circle-outline"
+
+    @property
+    def available(self) -> bool:
+        """Stay available so the error can be read while refreshes fail."""
+        return True
+
+    @property
+    def native_value(self) -> str | None:
+        """Return the last error message, truncated to fit a state."""
+        error = self.coordinator.metrics.last_error
+        return error[:255] if error else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, str | None]:
+        """Return when the error happened."""
+        return {"occurred_at": self.coordinator.metrics.last_error_at}
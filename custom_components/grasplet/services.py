@@ -0,0 +1,165 @@
+"""Services for the Grasplet integration."""
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.importlib import async_import_module
+
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_FORMAT,
+    ATTR_INCLUDE_HISTORY,
+    ATTR_SIM_ID,
+    DOMAIN,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMATS,
+    SERVICE_EXPORT,
+    SERVICE_PROFILE_REFRESH,
+    SERVICE_REFRESH,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import GraspletDataUpdateCoordinator
+
+PROFILE_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_SIM_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+EXPORT_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_FORMAT, default=EXPORT_FORMAT_CSV): vol.In(EXPORT_FORMATS),
+        vol.Optional(ATTR_INCLUDE_HISTORY, default=False): cv.boolean,
+    }
+)
+
+
+def _get_coordinators(
+    hass: HomeAssistant, entry_id: str | None
+) -> dict[str, GraspletDataUpdateCoordinator]:
+    """Return the loaded coordinators, optionally limited to one entry."""
+    coordinators: dict[str, GraspletDataUpdateCoordinator] = hass.data.get(DOMAIN, {})
+    if entry_id is None:
+        return dict(coordinators)
+    if entry_id not in coordinators:
+        raise ServiceValidationError(f"Grasplet entry {entry_id} is not loaded")
+    return {entry_id: coordinators[entry_id]}
+
+
+def _get_targeted_coordinators(
+    hass: HomeAssistant, call: ServiceCall
+) -> dict[str, GraspletDataUpdateCoordinator]:
+    """Return the coordinators owning the SIMs or devices a call targets."""
+    coordinators = _get_coordinators(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+    sim_ids: list[str] = call.data.get(ATTR_SIM_ID, [])
+    device_ids: list[str] = call.data.get(ATTR_DEVICE_ID, [])
+    if not sim_ids and not device_ids:
+        return coordinators
+    
+    selected: dict[str, GraspletDataUpdateCoordinator] = {}
+    for sim_id in sim_ids:
+        owners = {
+            entry_id: coordinator
+            for entry_id, coordinator in coordinators.items()
+            if coordinator.data and sim_id in coordinator.data
+        }
+        if not owners:
+            raise ServiceValidationError(f"Unknown Grasplet SIM {sim_id}")
+        selected.update(owners)
+    
+    device_registry = dr.async_get(hass)
+    for device_id in device_ids:
+        device = device_registry.async_get(device_id)
+        owners = {
+            entry_id: coordinators[entry_id]
+            for entry_id in (device.config_entries if device else ())
+            if entry_id in coordinators
+        }
+        if not owners:
+            raise ServiceValidationError(f"Device {device_id} is not a Grasplet device")
+        selected.update(owners)
+    
+    return selected
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Grasplet services."""
+
+    async def _async_profile_refresh(call: ServiceCall) -> ServiceResponse:
+        """Profile one refresh of each selected entry."""
+        coordinators = _get_coordinators(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        # One at a time, so each report only covers its own refresh
+        return {
+            entry_id: {"profile": await coordinator.async_profile_refresh()}
+            for entry_id, coordinator in coordinators.items()
+        }
+
+    async def _async_refresh(call: ServiceCall) -> None:
+        """Refresh the accounts owning the selected SIMs."""
+        coordinators = _get_targeted_coordinators(hass, call)
+        # The API returns a whole account at once, so each account is polled
+        # once however many of its SIMs were selected
+        await asyncio.gather(
+            *(
+                coordinator.async_request_refresh()
+                for coordinator in coordinators.values()
+            )
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_REFRESH, _async_refresh, schema=REFRESH_SCHEMA
+    )
+
+    async def _async_export(call: ServiceCall) -> ServiceResponse:
+        """Export the snapshot of each selected entry to a file."""
+        coordinators = _get_coordinators(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        # Imported in the executor the first time an export is requested
+        export = await async_import_module(hass, f"{__package__}.export")
+        return {
+            entry_id: await export.async_export(
+                hass,
+                coordinator,
+                call.data[ATTR_FORMAT],
+                call.data[ATTR_INCLUDE_HISTORY],
+            )
+            for entry_id, coordinator in coordinators.items()
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT,
+        _async_export,
+        schema=EXPORT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_REFRESH,
+        _async_profile_refresh,
+        schema=PROFILE_REFRESH_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,12 @@
+"""Tests for the Grasplet integration."""
+from __future__ import annotations
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+
+async def setup_integration(hass: HomeAssistant, entry: MockConfigEntry) -> None:
+    """Set up a config entry and wait for its platforms."""
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
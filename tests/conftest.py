@@ -0,0 +1,125 @@
+"""Fixtures for the Grasplet tests."""
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator, Callable, Generator
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from custom_components.grasplet.const import CONF_POLL_INTERVAL, DOMAIN
+
+from .fake_api import PASSWORD, USERNAME, FakeGraspletApi
+
+BENCHMARK_SIZES = "10,1000,10000,50000"
+
+_BENCHMARK_RESULTS = pytest.StashKey[list[tuple[str, int, float, str]]]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the benchmark options."""
+    group = parser.getgroup("grasplet")
+    group.addoption(
+        "--benchmark",
+        action="store_true",
+        help="run the fleet-scale benchmarks in tests/test_benchmark.py",
+    )
+    group.addoption(
+        "--benchmark-sizes",
+        default=BENCHMARK_SIZES,
+        help=f"comma separated fleet sizes to benchmark (default {BENCHMARK_SIZES})",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Prepare the benchmark result table."""
+    config.stash[_BENCHMARK_RESULTS] = []
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    """Run benchmarks once per fleet size."""
+    if "fleet_size" in metafunc.fixturenames:
+        sizes = metafunc.config.getoption("--benchmark-sizes")
+        metafunc.parametrize("fleet_size", [int(size) for size in sizes.split(",")])
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """Skip the benchmarks unless they were asked for."""
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks only run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus: int, config: pytest.Config) -> None:
+    """Print the benchmark results as one table."""
+    if not (results := config.stash[_BENCHMARK_RESULTS]):
+        return
+    terminalreporter.section("Grasplet benchmarks")
+    terminalreporter.write_line(f"{'metric':<32} {'SIMs':>8} {'value':>14}")
+    for name, size, value, unit in sorted(results, key=lambda row: (row[0], row[1])):
+        sims = size or ""
+        terminalreporter.write_line(f"{name:<32} {sims:>8} {value:>11.3f} {unit}")
+
+
+@pytest.fixture
+def benchmark_record(
+    request: pytest.FixtureRequest,
+) -> Callable[[str, int, float, str], None]:
+    """Return a function adding a row to the benchmark results.
+
+    Rows that do not depend on the fleet size are recorded with size 0.
+    """
+    results = request.config.stash[_BENCHMARK_RESULTS]
+
+    def _record(name: str, size: int, value: float, unit: str) -> None:
+        results.append((name, size, value, unit))
+
+    return _record
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Load the integration from custom_components."""
+
+
+@pytest.fixture(autouse=True)
+def no_retry_backoff() -> Generator[None]:
+    """Retry failed requests straight away."""
+    with patch("custom_components.grasplet.api.RETRY_BACKOFF_BASE", 0):
+        yield
+
+
+@pytest.fixture
+async def fake_api(socket_enabled: None) -> AsyncGenerator[FakeGraspletApi]:
+    """Serve a small fleet on localhost and point the API client at it."""
+    api = FakeGraspletApi()
+    await api.start()
+    with (
+        patch("custom_components.grasplet.api.LOGIN_URL", api.login_url),
+        patch("custom_components.grasplet.api.DATA_URL", api.data_url),
+    ):
+        yield api
+    await api.close()
+
+
+@pytest.fixture
+def config_entry(hass: HomeAssistant) -> MockConfigEntry:
+    """Add a config entry for the fake API's account."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=f"Grasplet ({USERNAME})",
+        unique_id=USERNAME,
+        data={
+            CONF_USERNAME: USERNAME,
+            CONF_PASSWORD: PASSWORD,
+            CONF_POLL_INTERVAL: 24,
+        },
+    )
+    entry.add_to_hass(hass)
+    return entry
@@ -0,0 +1,219 @@
+"""Local stand-in for the Grasplet API, used by the tests and benchmarks."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+from typing import Any
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+USERNAME = "user@example.com"
+PASSWORD = "secret"
+ACCESS_TOKEN = "fake-access-token"
+
+STATUSES = ("active", "active", "active", "suspended")
+UNITS = ("GB", "MB", "KB")
+
+
+def make_sim(index: int, rng: random.Random | None = None) -> dict[str, Any]:
+    """Return one /api/sim/all entry shaped like the real API's.
+
+    Besides the fields the integration reads, each SIM carries the kind of
+    extra fields and nesting the real API returns, so decode and memory
+    numbers are not flattered by a minimal payload.
+    """
+    rng = rng or random.Random(index)
+    data_limit = rng.choice((1, 5, 10, 20, 50))
+    unit = rng.choice(UNITS)
+    remaining_gb = round(rng.uniform(0, data_limit), 3)
+    remaining = remaining_gb * {"GB": 1, "MB": 1024, "KB": 1024 * 1024}[unit]
+    return {
+        "id": 100000 + index,
+        "name": f"SIM {index}",
+        "iccid": f"8944{index:015d}",
+        "imsi": f"234{index:012d}",
+        "msisdn": f"447{index:09d}",
+        "status": rng.choice(STATUSES),
+        "createdAt": "2025-01-01T00:00:00.000Z",
+        "tags": ["fleet", f"group-{index % 10}"],
+        "PlanUsageDetails": [
+            {
+                "id": 500000 + index,
+                "plan": {
+                    "id": 42,
+                    "planName": f"{data_limit}GB Plan",
+                    "dataLimit": data_limit,
+                    "expiryDate": f"2027-{index % 12 + 1:02d}-01T00:00:00.000Z",
+                    "price": 4.99,
+                    "currency": "GBP",
+                    "countries": ["GB", "IE", "FR"],
+                },
+                "usage": {
+                    "data": remaining,
+                    "dataUnit": unit,
+                    "availabilityZone": rng.choice(("Europe", "Global")),
+                    "sms": rng.randint(0, 50),
+                    "voice": 0,
+                },
+            }
+        ],
+    }
+
+
+def make_fleet(count: int, *, seed: int = 0) -> list[dict[str, Any]]:
+    """Return count synthetic SIMs; the same seed gives the same fleet."""
+    rng = random.Random(seed)
+    return [make_sim(index, rng) for index in range(count)]
+
+
+class FakeGraspletApi:
+    """aiohttp server answering /api/auth/login and /api/sim/all.
+
+    latency delays every response. Faults queued with fail() or stall()
+    are served, one per request, before normal handling, and failure_rate
+    answers that share of the remaining requests with a 503.
+    """
+
+    def __init__(
+        self,
+        sims: list[dict[str, Any]] | None = None,
+        *,
+        username: str = USERNAME,
+        password: str = PASSWORD,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the fake API with a fleet and the accepted credentials."""
+        self.username = username
+        self.password = password
+        self.token = ACCESS_TOKEN
+        self.token_lifetime: float | None = 3600
+        # Answer with an ETag and honour If-None-Match
+        self.etag = False
+        self.latency = 0.0
+        self.failure_rate = 0.0
+        self.requests = {"login": 0, "sims": 0}
+        self._rng = random.Random(seed)
+        self._faults: list[tuple[str, float]] = []
+        self._sims = sims if sims is not None else make_fleet(3, seed=seed)
+        self._body: bytes | None = None
+        self._server: TestServer | None = None
+
+    @property
+    def sims(self) -> list[dict[str, Any]]:
+        """Return the fleet served by /api/sim/all."""
+        return self._sims
+
+    @sims.setter
+    def sims(self, sims: list[dict[str, Any]]) -> None:
+        """Replace the fleet."""
+        self._sims = sims
+        self._body = None
+
+    def update_sim(self, index: int, **usage: Any) -> None:
+        """Change a SIM's status or usage fields, e.g. data=1.5."""
+        sim = self._sims[index]
+        if "status" in usage:
+            sim["status"] = usage.pop("status")
+        sim["PlanUsageDetails"][0]["usage"].update(usage)
+        self._body = None
+
+    @property
+    def body(self) -> bytes:
+        """Return the encoded /api/sim/all response, cached until the fleet changes."""
+        if self._body is None:
+            self._body = json.dumps({"result": True, "data": self._sims}).encode()
+        return self._body
+
+    @body.setter
+    def body(self, body: bytes) -> None:
+        """Serve these bytes until the fleet changes, e.g. a truncated body."""
+        self._body = body
+
+    def fail(self, status: int = 503, times: int = 1) -> None:
+        """Answer the next requests with an error status."""
+        self._faults.extend([("status", status)] * times)
+
+    def stall(self, seconds: float, times: int = 1) -> None:
+        """Hold the next requests before answering, e.g. past a read timeout."""
+        self._faults.extend([("stall", seconds)] * times)
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the running server."""
+        assert self._server is not None, "server not started"
+        return str(self._server.make_url("")).rstrip("/")
+
+    @property
+    def login_url(self) -> str:
+        """Return the login endpoint."""
+        return f"{self.url}/api/auth/login"
+
+    @property
+    def data_url(self) -> str:
+        """Return the SIM list endpoint."""
+        return f"{self.url}/api/sim/all"
+
+    async def start(self) -> None:
+        """Start serving on a free local port."""
+        app = web.Application()
+        app.router.add_post("/api/auth/login", self._handle_login)
+        app.router.add_get("/api/sim/all", self._handle_sims)
+        self._server = TestServer(app, host="127.0.0.1")
+        await self._server.start_server()
+
+    async def close(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            await self._server.close()
+            self._server = None
+
+    async def _fault(self) -> web.Response | None:
+        """Apply latency and return an injected error response, if any."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self._faults:
+            kind, value = self._faults.pop(0)
+            if kind == "stall":
+                await asyncio.sleep(value)
+            else:
+                return web.Response(status=int(value))
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            return web.Response(status=503)
+        return None
+
+    async def _handle_login(self, request: web.Request) -> web.Response:
+        """Issue a token for the configured credentials."""
+        self.requests["login"] += 1
+        if (response := await self._fault()) is not None:
+            return response
+        credentials = await request.json()
+        if (credentials.get("username"), credentials.get("password")) != (
+            self.username,
+            self.password,
+        ):
+            return web.json_response(
+                {"result": False, "message": "Invalid credentials"}, status=401
+            )
+        data: dict[str, Any] = {"access_token": self.token}
+        if self.token_lifetime is not None:
+            data["expires_in"] = self.token_lifetime
+        return web.json_response({"result": True, "data": data}, status=201)
+
+    async def _handle_sims(self, request: web.Request) -> web.Response:
+        """Return the fleet to a caller holding the current token."""
+        self.requests["sims"] += 1
+        if (response := await self._fault()) is not None:
+            return response
+        if request.headers.get("Authorization") != f"Bearer {self.token}":
+            return web.json_response({"result": False}, status=401)
+
+        body = self.body
+        headers = {}
+        if self.etag:
+            headers["ETag"] = f'"{hashlib.md5(body).hexdigest()}"'
+            if request.headers.get("If-None-Match") == headers["ETag"]:
+                return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type="application/json", headers=headers)
@@ -0,0 +1,226 @@
+"""Tests for the Grasplet API client."""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from custom_components.grasplet.api import (
+    CircuitBreaker,
+    GraspletApiClient,
+    GraspletApiError,
+    GraspletAuthError,
+    GraspletCircuitOpenError,
+    GraspletConnectionError,
+    GraspletTokenRejected,
+)
+from custom_components.grasplet.const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    DEFAULT_MAX_RETRIES,
+    STREAM_DECODE_THRESHOLD,
+)
+from custom_components.grasplet.models import parse_sims
+
+from .fake_api import ACCESS_TOKEN, PASSWORD, USERNAME, FakeGraspletApi, make_fleet
+
+
+@pytest.fixture
+async def client(hass: HomeAssistant, fake_api: FakeGraspletApi) -> GraspletApiClient:
+    """Return a client logged in to the fake API."""
+    client = GraspletApiClient(async_get_clientsession(hass), USERNAME, PASSWORD)
+    await client.async_login()
+    return client
+
+
+async def test_login(client: GraspletApiClient, fake_api: FakeGraspletApi) -> None:
+    """Logging in stores the token and when it expires."""
+    assert client.access_token == ACCESS_TOKEN
+    assert client.token_valid(margin=fake_api.token_lifetime - 60)
+    assert not client.token_valid(margin=fake_api.token_lifetime + 60)
+
+
+async def test_login_invalid_credentials(
+    hass: HomeAssistant, fake_api: FakeGraspletApi
+) -> None:
+    """A 401 from the login endpoint raises GraspletAuthError without retrying."""
+    client = GraspletApiClient(async_get_clientsession(hass), USERNAME, "wrong")
+    with pytest.raises(GraspletAuthError):
+        await client.async_login()
+    assert client.access_token is None
+    assert fake_api.requests["login"] == 1
+
+
+async def test_server_error_retried(
+    client: GraspletApiClient, fake_api: FakeGraspletApi
+) -> None:
+    """5xx responses are retried until one succeeds."""
+    fake_api.fail(503, times=2)
+    assert len(await client.async_get_sims()) == len(fake_api.sims)
+    assert fake_api.requests["sims"] == 3
+    assert client.retries == 2
+    assert client.breaker.state == "closed"
+
+
+async def test_retries_exhausted(
+    client: GraspletApiClient, fake_api: FakeGraspletApi
+) -> None:
+    """A request fails once every attempt has failed."""
+    fake_api.fail(500, times=DEFAULT_MAX_RETRIES + 1)
+    with pytest.raises(GraspletConnectionError, match="Server error: 500"):
+        await client.async_get_sims()
+    assert fake_api.requests["sims"] == DEFAULT_MAX_RETRIES + 1
+
+
+async def test_read_timeout(hass: HomeAssistant, fake_api: FakeGraspletApi) -> None:
+    """A response stalled past the read timeout fails instead of hanging."""
+    client = GraspletApiClient(
+        async_get_clientsession(hass), USERNAME, PASSWORD, read_timeout=0.1, max_retries=1
+    )
+    await client.async_login()
+    fake_api.stall(5)
+    assert len(await client.async_get_sims()) == len(fake_api.sims)
+    assert client.retries == 1
+
+    fake_api.stall(5, times=2)
+    with pytest.raises(GraspletConnectionError, match="Request failed"):
+        await client.async_get_sims()
+
+
+async def test_breaker_opens(client: GraspletApiClient, fake_api: FakeGraspletApi) -> None:
+    """Failed attempts open the breaker, which then rejects requests unsent."""
+    fake_api.fail(503, times=2 * CIRCUIT_FAILURE_THRESHOLD)
+    with pytest.raises(GraspletConnectionError):
+        await client.async_get_sims()
+    assert client.breaker.state == "closed"
+
+    # Retrying stops as soon as the threshold is reached
+    with pytest.raises(GraspletConnectionError):
+        await client.async_get_sims()
+    assert client.breaker.state == "open"
+    assert fake_api.requests["sims"] == CIRCUIT_FAILURE_THRESHOLD
+
+    with pytest.raises(GraspletCircuitOpenError):
+        await client.async_get_sims()
+    assert fake_api.requests["sims"] == CIRCUIT_FAILURE_THRESHOLD
+
+
+def test_breaker_half_open_probe(freezer: FrozenDateTimeFactory) -> None:
+    """Only one trial request is let through once the breaker times out."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+
+    freezer.tick(61)
+    assert breaker.state == "half_open"
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    # A failed trial re-opens the breaker straight away
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    # A trial that never reports back is replaced after another timeout
+    freezer.tick(61)
+    assert breaker.allow_request()
+    freezer.tick(61)
+    assert breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+
+
+async def test_token_rejected(client: GraspletApiClient, fake_api: FakeGraspletApi) -> None:
+    """A rejected token is cleared so the caller logs in again."""
+    fake_api.token = "rotated-token"
+    with pytest.raises(GraspletTokenRejected):
+        await client.async_get_sims()
+    assert client.access_token is None
+
+
+async def test_not_modified(client: GraspletApiClient, fake_api: FakeGraspletApi) -> None:
+    """A 304 answer to If-None-Match returns None."""
+    fake_api.etag = True
+    assert await client.async_get_sims()
+    assert await client.async_get_sims() is None
+    assert client.last_response_bytes == 0
+
+    fake_api.update_sim(0, data=0.5)
+    sims = await client.async_get_sims()
+    assert sims[0]["PlanUsageDetails"][0]["usage"]["data"] == 0.5
+
+
+async def test_unchanged_body(client: GraspletApiClient, fake_api: FakeGraspletApi) -> None:
+    """A body hashing the same as the last one returns None."""
+    assert await client.async_get_sims()
+    assert await client.async_get_sims() is None
+    assert client.last_decode_time == 0
+
+    fake_api.update_sim(1, status="suspended")
+    sims = await client.async_get_sims()
+    assert sims[1]["status"] == "suspended"
+
+    client.reset_validators()
+    assert await client.async_get_sims()
+
+
+@pytest.fixture
+def large_fleet(fake_api: FakeGraspletApi) -> FakeGraspletApi:
+    """Serve a fleet big enough to be stream-decoded."""
+    fake_api.sims = make_fleet(2000)
+    assert len(fake_api.body) >= STREAM_DECODE_THRESHOLD
+    return fake_api
+
+
+async def test_stream_decode(client: GraspletApiClient, large_fleet: FakeGraspletApi) -> None:
+    """Stream-decoding a large list parses to the same SIMs as decoding it whole."""
+    sims = await client.async_get_sims()
+    assert client.last_response_bytes == len(large_fleet.body)
+    # Keys the sensors never read are dropped
+    assert "tags" not in sims[0]
+    assert "sms" not in sims[0]["PlanUsageDetails"][0]["usage"]
+
+    expected = parse_sims(make_fleet(2000))
+    assert {
+        sim_id: sim.as_dict() for sim_id, sim in parse_sims(sims).items()
+    } == {sim_id: sim.as_dict() for sim_id, sim in expected.items()}
+
+
+async def test_stream_unchanged_not_decoded(
+    client: GraspletApiClient, large_fleet: FakeGraspletApi
+) -> None:
+    """An unchanged large body is hashed but never decoded."""
+    with patch.object(
+        client, "_async_decode_sims", wraps=client._async_decode_sims
+    ) as decode:
+        assert await client.async_get_sims()
+        assert await client.async_get_sims() is None
+        assert decode.call_count == 1
+
+        large_fleet.update_sim(1999, data=0.25)
+        sims = await client.async_get_sims()
+        assert decode.call_count == 2
+    assert sims[1999]["PlanUsageDetails"][0]["usage"]["data"] == 0.25
+
+
+@pytest.mark.parametrize("size", [3, 2000])
+async def test_invalid_json(
+    client: GraspletApiClient, fake_api: FakeGraspletApi, size: int
+) -> None:
+    """A truncated body raises GraspletApiError on both decode paths."""
+    fake_api.sims = make_fleet(size)
+    fake_api.body = fake_api.body[:-100]
+    with pytest.raises(GraspletApiError, match="Invalid JSON"):
+        await client.async_get_sims()
+
+    # The bad body is not remembered as the current SIM list
+    fake_api.sims = make_fleet(size)
+    assert len(await client.async_get_sims()) == size
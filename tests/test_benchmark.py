@@ -0,0 +1,198 @@
+"""Fleet-scale benchmarks for the Grasplet integration.
+
+Run with ``pytest --benchmark`` to print a table of timings and peak memory
+per fleet size, optionally limited with ``--benchmark-sizes 10,1000``.
+Without --benchmark the tests in this module are skipped.
+
+Every benchmark runs against the fake API on localhost. SIMs only get a
+Data Remaining sensor so that 50,000 SIM fleets fit in memory; entity setup
+and fan-out cost is per entity, so it grows with each sensor kind enabled.
+"""
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+from collections.abc import Callable
+from contextlib import nullcontext
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from custom_components.grasplet.api import GraspletApiClient
+from custom_components.grasplet.const import (
+    CONF_INACTIVE_SIM_SENSORS,
+    CONF_POLL_INTERVAL,
+    CONF_SIM_SENSORS,
+    DEFAULT_MAX_RETRIES,
+    DOMAIN,
+)
+from custom_components.grasplet.coordinator import GraspletDataUpdateCoordinator
+from custom_components.grasplet.metrics import PHASE_FANOUT, PHASE_TOTAL
+from custom_components.grasplet.models import parse_sims
+
+from . import setup_integration
+from .fake_api import PASSWORD, USERNAME, FakeGraspletApi, make_fleet
+
+pytestmark = pytest.mark.benchmark
+
+Record = Callable[[str, int, float, str], None]
+
+# Share of the fleet whose usage changes between polls
+CHANGED_SHARE = 0.01
+
+
+@pytest.fixture
+def bench_entry(hass: HomeAssistant) -> MockConfigEntry:
+    """Add an entry creating one sensor per SIM."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=f"Grasplet ({USERNAME})",
+        unique_id=USERNAME,
+        data={CONF_USERNAME: USERNAME, CONF_PASSWORD: PASSWORD, CONF_POLL_INTERVAL: 24},
+        options={
+            CONF_SIM_SENSORS: ["data_remaining"],
+            CONF_INACTIVE_SIM_SENSORS: ["data_remaining"],
+        },
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+def fleet_api(fake_api: FakeGraspletApi, fleet_size: int) -> FakeGraspletApi:
+    """Serve a synthetic fleet of fleet_size SIMs."""
+    fake_api.sims = make_fleet(fleet_size)
+    # Encode once up front so the server's work is not timed
+    assert fake_api.body
+    return fake_api
+
+
+def _change_usage(api: FakeGraspletApi, fleet_size: int, step: int) -> None:
+    """Change the remaining data of CHANGED_SHARE of the fleet."""
+    for index in range(0, fleet_size, max(1, int(1 / CHANGED_SHARE))):
+        usage = api.sims[index]["PlanUsageDetails"][0]["usage"]
+        api.update_sim(index, data=max(0.0, usage["data"] - step))
+    assert api.body
+
+
+async def test_setup_entry(
+    hass: HomeAssistant,
+    fleet_api: FakeGraspletApi,
+    bench_entry: MockConfigEntry,
+    fleet_size: int,
+    benchmark_record: Record,
+) -> None:
+    """Time async_setup_entry without a cached snapshot and again with one.
+
+    Without a cache the time includes the first fetch. Unloading saves the
+    snapshot, so the second setup creates the entities from it and leaves
+    the fetch to a background task.
+    """
+    start = time.perf_counter()
+    await setup_integration(hass, bench_entry)
+    benchmark_record("setup_entry", fleet_size, time.perf_counter() - start, "s")
+    assert len(hass.data[DOMAIN][bench_entry.entry_id].data) == fleet_size
+    assert await hass.config_entries.async_unload(bench_entry.entry_id)
+
+    start = time.perf_counter()
+    await setup_integration(hass, bench_entry)
+    benchmark_record("setup_entry_cached", fleet_size, time.perf_counter() - start, "s")
+    assert len(hass.data[DOMAIN][bench_entry.entry_id].data) == fleet_size
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+
+async def test_update(
+    hass: HomeAssistant,
+    fleet_api: FakeGraspletApi,
+    bench_entry: MockConfigEntry,
+    fleet_size: int,
+    benchmark_record: Record,
+) -> None:
+    """Time _async_update_data and fan-out for changed and unchanged polls."""
+    await setup_integration(hass, bench_entry)
+    coordinator: GraspletDataUpdateCoordinator = hass.data[DOMAIN][bench_entry.entry_id]
+
+    _change_usage(fleet_api, fleet_size, 1)
+    await coordinator.async_refresh()
+    metrics = coordinator.metrics
+    benchmark_record("update_data_changed", fleet_size, metrics.last(PHASE_TOTAL), "s")
+    benchmark_record("fanout_changed", fleet_size, metrics.last(PHASE_FANOUT), "s")
+
+    await coordinator.async_refresh()
+    assert metrics.unchanged_refreshes == 1
+    benchmark_record("update_data_unchanged", fleet_size, metrics.last(PHASE_TOTAL), "s")
+
+
+async def test_fanout_all(
+    hass: HomeAssistant,
+    fleet_api: FakeGraspletApi,
+    bench_entry: MockConfigEntry,
+    fleet_size: int,
+    benchmark_record: Record,
+) -> None:
+    """Time the fan-out after a failed refresh, when every entity is written."""
+    await setup_integration(hass, bench_entry)
+    coordinator: GraspletDataUpdateCoordinator = hass.data[DOMAIN][bench_entry.entry_id]
+
+    fleet_api.fail(503, times=DEFAULT_MAX_RETRIES + 1)
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+
+    fanout = coordinator.metrics.last(PHASE_FANOUT)
+    benchmark_record("fanout_all", fleet_size, fanout, "s")
+    benchmark_record("fanout_all_per_sim", fleet_size, fanout / fleet_size * 1e6, "us")
+
+
+async def test_parse(fleet_size: int, benchmark_record: Record) -> None:
+    """Time decoding and parsing the SIM list, best of three."""
+    sims = make_fleet(fleet_size)
+    body = json.dumps({"result": True, "data": sims}).encode()
+
+    decode = min(_timed(json.loads, body) for _ in range(3))
+    parse = min(_timed(parse_sims, sims) for _ in range(3))
+    benchmark_record("decode_json", fleet_size, decode, "s")
+    benchmark_record("parse", fleet_size, parse, "s")
+
+
+async def test_peak_memory(
+    hass: HomeAssistant,
+    fleet_api: FakeGraspletApi,
+    fleet_size: int,
+    benchmark_record: Record,
+) -> None:
+    """Measure peak memory of fetching and parsing, streamed and decoded whole."""
+    client = GraspletApiClient(async_get_clientsession(hass), USERNAME, PASSWORD)
+    await client.async_login()
+    benchmark_record("payload_size", fleet_size, len(fleet_api.body) / 2**20, "MiB")
+
+    for label, threshold in (("stream", None), ("json", float("inf"))):
+        client.reset_validators()
+        with (
+            patch("custom_components.grasplet.api.STREAM_DECODE_THRESHOLD", threshold)
+            if threshold is not None
+            else nullcontext()
+        ):
+            tracemalloc.start()
+            try:
+                data = parse_sims(await client.async_get_sims())
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        assert len(data) == fleet_size
+        del data
+        benchmark_record(f"peak_memory_{label}", fleet_size, peak / 2**20, "MiB")
+
+
+def _timed(func: Callable, *args) -> float:
+    """Return how long one call of func took."""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
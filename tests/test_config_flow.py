@@ -0,0 +1,150 @@
+"""Tests for the Grasplet config flow."""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant import config_entries
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.grasplet.const import CONF_POLL_INTERVAL, DATA_TOKEN_HANDOFF, DOMAIN
+
+from . import setup_integration
+from .fake_api import PASSWORD, USERNAME, FakeGraspletApi
+
+NEW_PASSWORD = "new-secret"
+
+
+async def test_user_flow(hass: HomeAssistant, fake_api: FakeGraspletApi) -> None:
+    """The entry is created and its first refresh reuses the flow's login."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    assert result["type"] is FlowResultType.FORM
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {CONF_USERNAME: USERNAME, CONF_PASSWORD: PASSWORD, CONF_POLL_INTERVAL: 24},
+    )
+    await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["result"].unique_id == USERNAME
+    assert fake_api.requests == {"login": 1, "sims": 1}
+    assert not hass.data.get(DATA_TOKEN_HANDOFF)
+
+
+async def test_user_flow_invalid_auth(
+    hass: HomeAssistant, fake_api: FakeGraspletApi
+) -> None:
+    """Rejected credentials show an error and leave no token behind."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_USERNAME: USERNAME, CONF_PASSWORD: "wrong"}
+    )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "invalid_auth"}
+    assert not hass.data.get(DATA_TOKEN_HANDOFF)
+
+
+async def test_user_flow_cannot_connect(
+    hass: HomeAssistant, fake_api: FakeGraspletApi
+) -> None:
+    """An unreachable API shows an error."""
+    fake_api.fail(503, times=10)
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_USERNAME: USERNAME, CONF_PASSWORD: PASSWORD}
+    )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "cannot_connect"}
+
+
+async def test_user_flow_already_configured(
+    hass: HomeAssistant, fake_api: FakeGraspletApi, config_entry: MockConfigEntry
+) -> None:
+    """A second entry for the same account aborts without handing off its token."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_USERNAME: USERNAME, CONF_PASSWORD: PASSWORD}
+    )
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+    assert not hass.data.get(DATA_TOKEN_HANDOFF)
+
+
+async def test_reauth(
+    hass: HomeAssistant, fake_api: FakeGraspletApi, config_entry: MockConfigEntry
+) -> None:
+    """A changed password starts a reauth flow that saves the new one."""
+    await setup_integration(hass, config_entry)
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    # The password is changed elsewhere, which also revokes the token
+    fake_api.password = NEW_PASSWORD
+    fake_api.token = "rotated-token"
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    [flow] = hass.config_entries.flow.async_progress_by_handler(DOMAIN)
+    assert flow["context"]["source"] == config_entries.SOURCE_REAUTH
+    assert flow["step_id"] == "reauth_confirm"
+
+    result = await hass.config_entries.flow.async_configure(
+        flow["flow_id"], {CONF_PASSWORD: "wrong"}
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "invalid_auth"}
+    assert not hass.data.get(DATA_TOKEN_HANDOFF)
+
+    with patch.object(
+        hass.config_entries, "async_reload", wraps=hass.config_entries.async_reload
+    ) as reload:
+        result = await hass.config_entries.flow.async_configure(
+            flow["flow_id"], {CONF_PASSWORD: NEW_PASSWORD}
+        )
+        await hass.async_block_till_done()
+
+    reload.assert_called_once_with(config_entry.entry_id)
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "reauth_successful"
+    assert config_entry.data[CONF_PASSWORD] == NEW_PASSWORD
+    assert config_entry.state is config_entries.ConfigEntryState.LOADED
+    assert hass.data[DOMAIN][config_entry.entry_id].last_update_success
+    assert not hass.data.get(DATA_TOKEN_HANDOFF)
+
+
+async def test_reauth_after_failed_setup(
+    hass: HomeAssistant, fake_api: FakeGraspletApi, config_entry: MockConfigEntry
+) -> None:
+    """An entry whose setup was rejected is set up again once reauthenticated."""
+    fake_api.password = NEW_PASSWORD
+    assert not await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert config_entry.state is config_entries.ConfigEntryState.SETUP_ERROR
+
+    [flow] = hass.config_entries.flow.async_progress_by_handler(DOMAIN)
+    with patch.object(
+        hass.config_entries, "async_reload", wraps=hass.config_entries.async_reload
+    ) as reload:
+        result = await hass.config_entries.flow.async_configure(
+            flow["flow_id"], {CONF_PASSWORD: NEW_PASSWORD}
+        )
+        await hass.async_block_till_done()
+
+    reload.assert_called_once_with(config_entry.entry_id)
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "reauth_successful"
+    assert config_entry.state is config_entries.ConfigEntryState.LOADED
@@ -0,0 +1,341 @@
+"""Tests for the Grasplet data update coordinator."""
+from __future__ import annotations
+
+import asyncio
+import gc
+import time
+from datetime import timedelta
+from functools import partial
+from unittest.mock import patch
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from custom_components.grasplet.const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    CONF_ADAPTIVE_POLLING,
+    CONF_POLL_INTERVAL,
+    CONF_READ_TIMEOUT,
+    DOMAIN,
+    EVENT_THRESHOLD_CROSSED,
+    SERVICE_REFRESH,
+    TOKEN_REFRESH_MARGIN,
+)
+from custom_components.grasplet.coordinator import GraspletDataUpdateCoordinator
+from custom_components.grasplet.polling import (
+    REASON_DATA_CRITICAL,
+    REASON_EXPIRY_SOON,
+    REASON_NORMAL,
+)
+from custom_components.grasplet.scheduler import GraspletScheduler
+
+from . import setup_integration
+from .fake_api import PASSWORD, USERNAME, FakeGraspletApi, make_fleet
+
+SMALL_FLEET = 50
+LARGE_FLEET = 32 * SMALL_FLEET
+
+
+async def _fanout_per_sim(
+    coordinator: GraspletDataUpdateCoordinator, fake_api: FakeGraspletApi
+) -> float:
+    """Return the best per-SIM time of fan-outs after every SIM's usage changed."""
+    timings: list[float] = []
+    notify = coordinator.async_update_listeners
+
+    def _timed_notify() -> None:
+        # Collections are triggered by allocations elsewhere in the test run
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            notify()
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+    coordinator.async_update_listeners = _timed_notify
+    try:
+        for _ in range(5):
+            for index, sim in enumerate(fake_api.sims):
+                usage = sim["PlanUsageDetails"][0]["usage"]
+                fake_api.update_sim(index, data=usage["data"] + 1)
+            await coordinator.async_refresh()
+            assert coordinator.last_update_success
+    finally:
+        del coordinator.async_update_listeners
+    return min(timings) / len(coordinator.data)
+
+
+async def _setup_fleet(
+    hass: HomeAssistant, fake_api: FakeGraspletApi, size: int
+) -> GraspletDataUpdateCoordinator:
+    """Set up a new entry for a fleet of the given size."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: USERNAME, CONF_PASSWORD: PASSWORD, CONF_POLL_INTERVAL: 24},
+    )
+    entry.add_to_hass(hass)
+    fake_api.sims = make_fleet(size)
+    await setup_integration(hass, entry)
+    return hass.data[DOMAIN][entry.entry_id]
+
+
+async def test_fanout_grows_linearly(hass: HomeAssistant, fake_api: FakeGraspletApi) -> None:
+    """Per-SIM fan-out cost stays flat when the fleet grows 32-fold."""
+    small_coordinator = await _setup_fleet(hass, fake_api, SMALL_FLEET)
+    small = await _fanout_per_sim(small_coordinator, fake_api)
+    assert await hass.config_entries.async_unload(small_coordinator.entry.entry_id)
+
+    large_coordinator = await _setup_fleet(hass, fake_api, LARGE_FLEET)
+    large = await _fanout_per_sim(large_coordinator, fake_api)
+
+    # Looking each SIM up with a scan of the fleet makes this ratio 3 or more
+    assert large < 2 * small, f"{small * 1e6:.1f} us vs {large * 1e6:.1f} us per SIM"
+
+
+async def test_history_sampled_while_unchanged(
+    hass: HomeAssistant,
+    fake_api: FakeGraspletApi,
+    config_entry: MockConfigEntry,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """An unchanged SIM list still adds samples, so an idle SIM's rate falls."""
+    fake_api.update_sim(0, data=10.0, dataUnit="GB")
+    await setup_integration(hass, config_entry)
+    coordinator: GraspletDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    sim_id = str(fake_api.sims[0]["id"])
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"{sim_id}_consumption_rate"
+    )
+
+    freezer.tick(86400)
+    fake_api.update_sim(0, data=9.0)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert coordinator.history[sim_id].rate == 1.0
+    assert float(hass.states.get(entity_id).state) == 1.0
+
+    freezer.tick(86400)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert coordinator.metrics.unchanged_refreshes == 1
+    assert len(coordinator.history[sim_id]) == 3
+    assert coordinator.history[sim_id].rate == 0.5
+    assert float(hass.states.get(entity_id).state) == 0.5
+
+
+async def test_profile_runs_own_refresh(
+    hass: HomeAssistant, fake_api: FakeGraspletApi, config_entry: MockConfigEntry
+) -> None:
+    """Profiling during a refresh waits for it and then profiles a whole one."""
+    await setup_integration(hass, config_entry)
+    coordinator: GraspletDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    fake_api.latency = 0.1
+    refresh = hass.async_create_task(coordinator.async_refresh())
+    await asyncio.sleep(0)
+    report = await coordinator.async_profile_refresh()
+    await refresh
+
+    assert fake_api.requests["sims"] == 3
+    assert coordinator.metrics.coalesced_refreshes == 0
+    assert "_async_update_data" in report
+    assert coordinator.last_profile == report
+
+
+async def test_refresh_after_breaker_cooldown(
+    hass: HomeAssistant,
+    fake_api: FakeGraspletApi,
+    config_entry: MockConfigEntry,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """A refresh after the breaker's cooldown probes the API and recovers."""
+    await setup_integration(hass, config_entry)
+    coordinator: GraspletDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    fake_api.fail(503, times=CIRCUIT_FAILURE_THRESHOLD)
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert coordinator.client.breaker.state == "open"
+
+    # The API is back, but nothing is sent until the cooldown is over
+    requests = fake_api.requests["sims"]
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert fake_api.requests["sims"] == requests
+
+    freezer.tick(CIRCUIT_RESET_TIMEOUT + 1)
+    await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True)
+    assert coordinator.last_update_success
+    assert coordinator.client.breaker.state == "closed"
+    assert fake_api.requests["sims"] == requests + 1
+
+
+async def test_failing_account_does_not_block_others(
+    hass: HomeAssistant, fake_api: FakeGraspletApi
+) -> None:
+    """An account retrying a failing API frees the request slot between attempts."""
+    entries = [
+        MockConfigEntry(
+            domain=DOMAIN,
+            data={CONF_USERNAME: USERNAME, CONF_PASSWORD: PASSWORD, CONF_POLL_INTERVAL: 24},
+            options=options,
+        )
+        for options in ({CONF_READ_TIMEOUT: 0.05}, {})
+    ]
+    # One request in flight at a time across both accounts
+    with patch(
+        "custom_components.grasplet.GraspletScheduler",
+        partial(GraspletScheduler, max_concurrent=1),
+    ):
+        for entry in entries:
+            entry.add_to_hass(hass)
+            await setup_integration(hass, entry)
+    failing, healthy = (hass.data[DOMAIN][entry.entry_id] for entry in entries)
+
+    # Every attempt of the failing account now times out
+    fake_api.latency = 0.2
+    failing_refresh = hass.async_create_task(failing.async_refresh())
+    await asyncio.sleep(0.01)
+
+    await healthy.async_refresh()
+    assert healthy.last_update_success
+    assert not failing_refresh.done()
+
+    await failing_refresh
+    assert not failing.last_update_success
+
+
+async def test_token_refreshed_before_expiry(
+    hass: HomeAssistant,
+    fake_api: FakeGraspletApi,
+    config_entry: MockConfigEntry,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """A token about to expire is replaced before the SIMs are fetched."""
+    await setup_integration(hass, config_entry)
+    coordinator: GraspletDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    # The old token would be rejected once the new one is issued
+    fake_api.token = "renewed-token"
+    freezer.tick(fake_api.token_lifetime - TOKEN_REFRESH_MARGIN + 1)
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.client.access_token == "renewed-token"
+    assert fake_api.requests == {"login": 2, "sims": 2}
+
+
+async def test_token_rejected_mid_session(
+    hass: HomeAssistant, fake_api: FakeGraspletApi, config_entry: MockConfigEntry
+) -> None:
+    """A token revoked before it expires costs one login and one retried fetch."""
+    await setup_integration(hass, config_entry)
+    coordinator: GraspletDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    fake_api.token = "rotated-token"
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.client.access_token == "rotated-token"
+    assert coordinator.metrics.reauth_count == 1
+    assert fake_api.requests == {"login": 2, "sims": 3}
+
+
+@pytest.fixture
+async def adaptive_coordinator(
+    hass: HomeAssistant, fake_api: FakeGraspletApi
+) -> GraspletDataUpdateCoordinator:
+    """Set up adaptive polling for a fleet with plenty of data and time left."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: USERNAME, CONF_PASSWORD: PASSWORD, CONF_POLL_INTERVAL: 24},
+        options={CONF_ADAPTIVE_POLLING: True},
+    )
+    entry.add_to_hass(hass)
+    for index, sim in enumerate(fake_api.sims):
+        sim["PlanUsageDetails"][0]["plan"]["dataLimit"] = 10
+        fake_api.update_sim(index, data=8.0, dataUnit="GB")
+    await setup_integration(hass, entry)
+    coordinator: GraspletDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    _assert_polls_every(coordinator, timedelta(hours=24), REASON_NORMAL)
+    return coordinator
+
+
+def _assert_polls_every(
+    coordinator: GraspletDataUpdateCoordinator, interval: timedelta, reason: str
+) -> None:
+    """Check the poll interval and that the next poll is scheduled from it."""
+    assert coordinator.poll_interval == interval
+    assert coordinator.poll_reason == reason
+    # The delay to the account's slot is between half and one and a half intervals
+    assert interval / 2 <= coordinator.update_interval <= interval * 1.5
+
+
+async def test_polls_faster_near_depletion(
+    adaptive_coordinator: GraspletDataUpdateCoordinator, fake_api: FakeGraspletApi
+) -> None:
+    """A SIM nearly out of data polls at the floor until it is topped up."""
+    # 5% left; a budget of 24 requests a day allows hourly polls
+    fake_api.update_sim(0, data=0.5)
+    await adaptive_coordinator.async_refresh()
+    _assert_polls_every(adaptive_coordinator, timedelta(hours=1), REASON_DATA_CRITICAL)
+
+    fake_api.update_sim(0, data=10.0)
+    await adaptive_coordinator.async_refresh()
+    _assert_polls_every(adaptive_coordinator, timedelta(hours=24), REASON_NORMAL)
+
+
+async def test_polls_faster_near_expiry(
+    adaptive_coordinator: GraspletDataUpdateCoordinator, fake_api: FakeGraspletApi
+) -> None:
+    """A plan expiring within three days polls four times as often until renewed."""
+    plan = fake_api.sims[1]["PlanUsageDetails"][0]["plan"]
+    renewal = plan["expiryDate"]
+    expiry = dt_util.utcnow() + timedelta(hours=48)
+    plan["expiryDate"] = expiry.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    fake_api.update_sim(1, data=7.5)
+    await adaptive_coordinator.async_refresh()
+    _assert_polls_every(adaptive_coordinator, timedelta(hours=6), REASON_EXPIRY_SOON)
+
+    plan["expiryDate"] = renewal
+    fake_api.update_sim(1, data=7.0)
+    await adaptive_coordinator.async_refresh()
+    _assert_polls_every(adaptive_coordinator, timedelta(hours=24), REASON_NORMAL)
+
+
+async def test_threshold_crossing_fires_event(
+    hass: HomeAssistant, fake_api: FakeGraspletApi, config_entry: MockConfigEntry
+) -> None:
+    """A SIM dropping below a remaining-data threshold fires a bus event."""
+    fake_api.sims[0]["PlanUsageDetails"][0]["plan"]["dataLimit"] = 10
+    fake_api.update_sim(0, data=8.0, dataUnit="GB")
+    await setup_integration(hass, config_entry)
+    events = async_capture_events(hass, EVENT_THRESHOLD_CROSSED)
+
+    fake_api.update_sim(0, data=2.0)
+    await hass.data[DOMAIN][config_entry.entry_id].async_refresh()
+    await hass.async_block_till_done()
+
+    assert [event.data for event in events] == [
+        {
+            "config_entry_id": config_entry.entry_id,
+            "sim_id": str(fake_api.sims[0]["id"]),
+            "name": fake_api.sims[0]["name"],
+            "threshold": 25.0,
+            "direction": "below",
+            "remaining_percent": 20.0,
+            "data_remaining": 2.0,
+        }
+    ]
@@ -0,0 +1,43 @@
+"""Tests for the Grasplet diagnostics."""
+from __future__ import annotations
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.components.diagnostics import (
+    get_diagnostics_for_config_entry,
+)
+from pytest_homeassistant_custom_component.typing import ClientSessionGenerator
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from . import setup_integration
+from .fake_api import FakeGraspletApi
+
+REDACTED = "**REDACTED**"
+
+
+async def test_diagnostics_redacted(
+    hass: HomeAssistant,
+    hass_client: ClientSessionGenerator,
+    fake_api: FakeGraspletApi,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Credentials, tokens and identifiers are redacted from diagnostics."""
+    # A token in the entry data must not leak either
+    hass.config_entries.async_update_entry(
+        config_entry, data={**config_entry.data, "access_token": fake_api.token}
+    )
+    await setup_integration(hass, config_entry)
+
+    diagnostics = await get_diagnostics_for_config_entry(hass, hass_client, config_entry)
+
+    entry = diagnostics["entry"]
+    assert entry["title"] == REDACTED
+    assert entry["unique_id"] == REDACTED
+    assert entry["data"][CONF_USERNAME] == REDACTED
+    assert entry["data"][CONF_PASSWORD] == REDACTED
+    assert entry["data"]["access_token"] == REDACTED
+    assert diagnostics["sim_sample"]
+    for sim in diagnostics["sim_sample"]:
+        assert sim["iccid"] == REDACTED
+    assert diagnostics["refresh"]["sim_count"] == len(fake_api.sims)
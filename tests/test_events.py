@@ -0,0 +1,92 @@
+"""Tests for the Grasplet threshold and plan expiry events."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.grasplet.const import (
+    EVENT_PLAN_EXPIRING,
+    EVENT_THRESHOLD_CROSSED,
+)
+from custom_components.grasplet.events import (
+    DIRECTION_ABOVE,
+    DIRECTION_BELOW,
+    SimEventTracker,
+)
+from custom_components.grasplet.models import GraspletSim
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+EXPIRY = NOW + timedelta(days=30)
+
+
+def _snapshot(
+    remaining: float, expiry_date: datetime | None = EXPIRY
+) -> dict[str, GraspletSim]:
+    """Return a snapshot of one 10 GB SIM with the given GB remaining."""
+    sim = GraspletSim(
+        sim_id="1",
+        name="SIM 1",
+        expiry_date=expiry_date,
+        data_limit=10.0,
+        data_remaining=remaining,
+    )
+    return {sim.sim_id: sim}
+
+
+def _tracker() -> SimEventTracker:
+    """Return a tracker for 25% and 10% remaining, 7 and 1 days, 2 points band."""
+    return SimEventTracker((25.0, 10.0), (7.0, 1.0), 2.0)
+
+
+def test_new_sim_sets_baseline() -> None:
+    """A SIM seen for the first time fires nothing, even below every threshold."""
+    tracker = _tracker()
+    assert tracker.evaluate(_snapshot(0.5, NOW + timedelta(hours=12)), NOW) == []
+    # Already below both thresholds and within both expiry levels
+    assert tracker.evaluate(_snapshot(0.4, NOW + timedelta(hours=12)), NOW) == []
+
+
+def test_threshold_hysteresis() -> None:
+    """Recovery only re-arms a threshold above the threshold plus the band."""
+    tracker = _tracker()
+    tracker.evaluate(_snapshot(5.0), NOW)
+
+    events = tracker.evaluate(_snapshot(2.4), NOW)
+    assert [(event, data["threshold"], data["direction"]) for event, data in events] == [
+        (EVENT_THRESHOLD_CROSSED, 25.0, DIRECTION_BELOW)
+    ]
+    assert events[0][1]["remaining_percent"] == 24.0
+
+    # Back to 26% is inside the band: neither recovered nor crossed again
+    assert tracker.evaluate(_snapshot(2.6), NOW) == []
+    assert tracker.evaluate(_snapshot(2.4), NOW) == []
+
+    # 27.5% clears 25% + 2, which re-arms the threshold
+    events = tracker.evaluate(_snapshot(2.75), NOW)
+    assert [(data["threshold"], data["direction"]) for _, data in events] == [
+        (25.0, DIRECTION_ABOVE)
+    ]
+    events = tracker.evaluate(_snapshot(2.4), NOW)
+    assert [(data["threshold"], data["direction"]) for _, data in events] == [
+        (25.0, DIRECTION_BELOW)
+    ]
+
+
+def test_one_event_per_expiry_level() -> None:
+    """Each expiry level fires once per plan expiry date."""
+    tracker = _tracker()
+    expiry = NOW + timedelta(days=10)
+    tracker.evaluate(_snapshot(5.0, expiry), NOW)
+
+    fired: list[float] = []
+    for days_left in (6, 5, 2, 0.5, 0.25):
+        for event, data in tracker.evaluate(
+            _snapshot(5.0, expiry), expiry - timedelta(days=days_left)
+        ):
+            assert event == EVENT_PLAN_EXPIRING
+            fired.append(data["days"])
+    assert fired == [7.0, 1.0]
+
+    # A renewed plan starts over
+    renewed = expiry + timedelta(days=30)
+    events = tracker.evaluate(_snapshot(5.0, renewed), renewed - timedelta(days=6))
+    assert [data["days"] for _, data in events] == [7.0]
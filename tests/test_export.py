@@ -0,0 +1,93 @@
+"""Tests for the Grasplet export service."""
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.grasplet import export
+from custom_components.grasplet.const import DOMAIN, SERVICE_EXPORT
+
+from . import setup_integration
+from .fake_api import FakeGraspletApi
+
+
+@pytest.fixture
+async def loaded_entry(
+    hass: HomeAssistant,
+    fake_api: FakeGraspletApi,
+    config_entry: MockConfigEntry,
+    tmp_path: Path,
+) -> MockConfigEntry:
+    """Set up the entry with exports written under tmp_path."""
+    hass.config.config_dir = str(tmp_path)
+    await setup_integration(hass, config_entry)
+    return config_entry
+
+
+async def _export(hass: HomeAssistant, **data) -> dict:
+    """Call the export service and return its response."""
+    return await hass.services.async_call(
+        DOMAIN, SERVICE_EXPORT, data, blocking=True, return_response=True
+    )
+
+
+async def test_export_csv(
+    hass: HomeAssistant, fake_api: FakeGraspletApi, loaded_entry: MockConfigEntry
+) -> None:
+    """CSV exports write one row per SIM and the history to a second file."""
+    response = await _export(hass, include_history=True)
+    result = response[loaded_entry.entry_id]
+
+    with open(result["path"], newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    assert result["rows"] == len(rows) == len(fake_api.sims)
+    assert tuple(rows[0]) == export.EXPORT_FIELDS
+    assert rows[0]["sim_id"] == str(fake_api.sims[0]["id"])
+
+    with open(result["history_path"], newline="", encoding="utf-8") as file:
+        history = list(csv.DictReader(file))
+    assert {row["sim_id"] for row in history} == {row["sim_id"] for row in rows}
+
+
+async def test_export_jsonl(
+    hass: HomeAssistant, fake_api: FakeGraspletApi, loaded_entry: MockConfigEntry
+) -> None:
+    """JSON Lines exports keep each SIM's history on its own line."""
+    response = await _export(hass, format="jsonl", include_history=True)
+    result = response[loaded_entry.entry_id]
+
+    assert "history_path" not in result
+    with open(result["path"], encoding="utf-8") as file:
+        rows = [json.loads(line) for line in file]
+    assert len(rows) == len(fake_api.sims)
+    assert len(rows[0]["history"]) == 1
+
+
+async def test_export_failed_open_closes_files(
+    hass: HomeAssistant, loaded_entry: MockConfigEntry
+) -> None:
+    """A history file that cannot be created does not leak the main file."""
+    export_file = export._ExportFile
+    opened: list[export._ExportFile] = []
+
+    def _open(path: str, fieldnames: tuple[str, ...] | None) -> export._ExportFile:
+        if fieldnames == export.HISTORY_FIELDS:
+            raise OSError("disk full")
+        opened.append(export_file(path, fieldnames))
+        return opened[-1]
+
+    with (
+        patch.object(export, "_ExportFile", _open),
+        pytest.raises(OSError, match="disk full"),
+    ):
+        await _export(hass, include_history=True)
+
+    [main_file] = opened
+    assert main_file._file.closed
@@ -0,0 +1,93 @@
+"""Tests for what importing the Grasplet modules loads, and how long it takes.
+
+Each import runs in a fresh interpreter after the Home Assistant modules the
+core has already loaded by the time it imports an integration, so only the
+integration's own cost is seen.
+"""
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+
+PRELOADED = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.selector",
+)
+
+MODULES = (
+    "custom_components.grasplet",
+    "custom_components.grasplet.config_flow",
+    "custom_components.grasplet.diagnostics",
+    "custom_components.grasplet.coordinator",
+    "custom_components.grasplet.api",
+    "custom_components.grasplet.sensor",
+)
+
+# Loaded when an entry is set up, not when the config flow opens
+DEFERRED = (
+    "custom_components.grasplet.coordinator",
+    "custom_components.grasplet.api",
+    "custom_components.grasplet.sensor",
+    "custom_components.grasplet.export",
+    "homeassistant.helpers.update_coordinator",
+    "ijson",
+)
+
+_SCRIPT = """
+import importlib, json, sys, time
+for name in {preloaded!r}:
+    importlib.import_module(name)
+before = set(sys.modules)
+start = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "loaded": sorted(set(sys.modules) - before),
+}}))
+"""
+
+
+def _import(*modules: str) -> dict:
+    """Import modules in a fresh interpreter, returning its time and what it loaded."""
+    script = _SCRIPT.format(preloaded=PRELOADED, modules=modules)
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def test_config_flow_does_not_load_coordinator() -> None:
+    """The config flow and diagnostics load without the coordinator or API client."""
+    loaded = _import(
+        "custom_components.grasplet.config_flow",
+        "custom_components.grasplet.diagnostics",
+    )["loaded"]
+
+    assert "custom_components.grasplet.config_flow" in loaded
+    assert not set(DEFERRED) & set(loaded)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("module", MODULES)
+def test_import_time(
+    module: str, benchmark_record: Callable[[str, int, float, str], None]
+) -> None:
+    """Time importing each module on its own, best of three."""
+    seconds = min(_import(module)["seconds"] for _ in range(3))
+    name = module.removeprefix("custom_components.")
+    benchmark_record(f"import {name}", 0, seconds * 1000, "ms")
@@ -0,0 +1,135 @@
+"""Tests for setting up the Grasplet integration."""
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.grasplet.const import (
+    CONF_POLL_INTERVAL,
+    CONF_SIM_SENSORS,
+    DOMAIN,
+)
+
+from . import setup_integration
+from .fake_api import USERNAME, FakeGraspletApi
+
+
+async def test_setup_and_unload(
+    hass: HomeAssistant, fake_api: FakeGraspletApi, config_entry: MockConfigEntry
+) -> None:
+    """The entry loads, creates SIM sensors and unloads again."""
+    await setup_integration(hass, config_entry)
+
+    assert config_entry.state is ConfigEntryState.LOADED
+    assert fake_api.requests == {"login": 1, "sims": 1}
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    assert len(coordinator.data) == len(fake_api.sims)
+    assert hass.states.async_entity_ids("sensor")
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert config_entry.state is ConfigEntryState.NOT_LOADED
+
+
+async def test_setup_from_cache(
+    hass: HomeAssistant, fake_api: FakeGraspletApi, config_entry: MockConfigEntry
+) -> None:
+    """Cached SIMs are set up without the API and replaced by the background refresh."""
+    fake_api.update_sim(0, data=8.0, dataUnit="GB")
+    await setup_integration(hass, config_entry)
+    # Unloading saves the snapshot, as stopping Home Assistant does
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"{fake_api.sims[0]['id']}_data_remaining"
+    )
+
+    # The API does not answer until well after setup has finished
+    fake_api.update_sim(0, data=6.0)
+    fake_api.stall(1)
+    await setup_integration(hass, config_entry)
+
+    assert config_entry.state is ConfigEntryState.LOADED
+    assert float(hass.states.get(entity_id).state) == 8.0
+
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert float(hass.states.get(entity_id).state) == 6.0
+    # The cached token was used, so the API was not logged in to again
+    assert fake_api.requests == {"login": 1, "sims": 2}
+
+
+async def test_reload_reuses_token(
+    hass: HomeAssistant, fake_api: FakeGraspletApi, config_entry: MockConfigEntry
+) -> None:
+    """The token stored with the snapshot is used after a reload instead of a login."""
+    await setup_integration(hass, config_entry)
+
+    assert await hass.config_entries.async_reload(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    assert coordinator.last_update_success
+    assert coordinator.client.access_token == fake_api.token
+    assert fake_api.requests == {"login": 1, "sims": 2}
+
+
+async def test_options_apply_without_reload(
+    hass: HomeAssistant, fake_api: FakeGraspletApi, config_entry: MockConfigEntry
+) -> None:
+    """Changed options are applied to the running coordinator."""
+    fake_api.update_sim(0, status="active")
+    await setup_integration(hass, config_entry)
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    registry = er.async_get(hass)
+    plan_unique_id = f"{fake_api.sims[0]['id']}_plan_name"
+    assert registry.async_get_entity_id("sensor", DOMAIN, plan_unique_id)
+
+    with patch.object(
+        hass.config_entries, "async_reload", wraps=hass.config_entries.async_reload
+    ) as reload:
+        hass.config_entries.async_update_entry(
+            config_entry,
+            options={CONF_POLL_INTERVAL: 6, CONF_SIM_SENSORS: ["data_remaining"]},
+        )
+        await hass.async_block_till_done()
+
+    reload.assert_not_called()
+    assert hass.data[DOMAIN][config_entry.entry_id] is coordinator
+    assert coordinator.poll_interval == timedelta(hours=6)
+    assert not registry.async_get_entity_id("sensor", DOMAIN, plan_unique_id)
+    assert registry.async_get_entity_id(
+        "sensor", DOMAIN, f"{fake_api.sims[0]['id']}_data_remaining"
+    )
+    # Neither a login nor a refresh
+    assert fake_api.requests == {"login": 1, "sims": 1}
+
+
+async def test_credential_change_reloads(
+    hass: HomeAssistant, fake_api: FakeGraspletApi, config_entry: MockConfigEntry
+) -> None:
+    """A changed password reloads the entry so a new client logs in with it."""
+    await setup_integration(hass, config_entry)
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    fake_api.password = "new-password"
+    fake_api.token = "rotated-token"
+
+    with patch.object(
+        hass.config_entries, "async_reload", wraps=hass.config_entries.async_reload
+    ) as reload:
+        hass.config_entries.async_update_entry(
+            config_entry, data={**config_entry.data, CONF_PASSWORD: "new-password"}
+        )
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    reload.assert_called_once_with(config_entry.entry_id)
+    assert config_entry.state is ConfigEntryState.LOADED
+    new_coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    assert new_coordinator is not coordinator
+    assert new_coordinator.client.credentials == (USERNAME, "new-password")
+    assert new_coordinator.last_update_success
+    assert new_coordinator.client.access_token == "rotated-token"
@@ -0,0 +1,168 @@
+"""Tests for the Grasplet sensors."""
+from __future__ import annotations
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+from custom_components.grasplet.const import (
+    CONF_EVENT_THRESHOLDS,
+    CONF_INACTIVE_SIM_SENSORS,
+    CONF_POLL_INTERVAL,
+    CONF_REMAINING_DEADBAND,
+    CONF_REMAINING_DEADBAND_MODE,
+    CONF_SIM_SENSORS,
+    DOMAIN,
+)
+from custom_components.grasplet.coordinator import GraspletDataUpdateCoordinator
+from custom_components.grasplet.deadband import DEADBAND_ABSOLUTE
+
+from . import setup_integration
+from .fake_api import PASSWORD, USERNAME, FakeGraspletApi
+
+ACTIVE_SENSORS = ["data_remaining", "status"]
+
+
+def _sim_sensors(hass: HomeAssistant, sim_id: str) -> set[str]:
+    """Return the sensor kinds registered for a SIM."""
+    return {
+        key
+        for key in ("data_remaining", "status", "plan_name")
+        if er.async_get(hass).async_get_entity_id("sensor", DOMAIN, f"{sim_id}_{key}")
+    }
+
+
+def _has_device(hass: HomeAssistant, sim_id: str) -> bool:
+    """Return True if the SIM's device is in the registry."""
+    return dr.async_get(hass).async_get_device(identifiers={(DOMAIN, sim_id)}) is not None
+
+
+async def test_status_change_syncs_sensors(
+    hass: HomeAssistant, fake_api: FakeGraspletApi
+) -> None:
+    """A SIM changing status gets the sensors of its new status and no empty device."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id=USERNAME,
+        data={CONF_USERNAME: USERNAME, CONF_PASSWORD: PASSWORD, CONF_POLL_INTERVAL: 24},
+        # Inactive SIMs get no sensors at all
+        options={CONF_SIM_SENSORS: ACTIVE_SENSORS, CONF_INACTIVE_SIM_SENSORS: []},
+    )
+    entry.add_to_hass(hass)
+    for index, status in enumerate(("active", "active", "suspended")):
+        fake_api.update_sim(index, status=status)
+    sim_ids = [str(sim["id"]) for sim in fake_api.sims]
+
+    await setup_integration(hass, entry)
+    assert _sim_sensors(hass, sim_ids[1]) == set(ACTIVE_SENSORS)
+    assert _has_device(hass, sim_ids[1])
+    assert not _sim_sensors(hass, sim_ids[2])
+    assert not _has_device(hass, sim_ids[2])
+
+    fake_api.update_sim(1, status="suspended")
+    fake_api.update_sim(2, status="active")
+    await hass.data[DOMAIN][entry.entry_id].async_refresh()
+    await hass.async_block_till_done()
+
+    assert not _sim_sensors(hass, sim_ids[1])
+    assert not _has_device(hass, sim_ids[1])
+    assert _sim_sensors(hass, sim_ids[2]) == set(ACTIVE_SENSORS)
+    assert _has_device(hass, sim_ids[2])
+    assert hass.states.get(
+        er.async_get(hass).async_get_entity_id("sensor", DOMAIN, f"{sim_ids[2]}_status")
+    ).state == "active"
+    assert _sim_sensors(hass, sim_ids[0]) == set(ACTIVE_SENSORS)
+
+
+async def test_dropped_sim_removed(
+    hass: HomeAssistant, fake_api: FakeGraspletApi, config_entry: MockConfigEntry
+) -> None:
+    """A SIM gone from the account loses its entities and its device."""
+    sim_ids = [str(sim["id"]) for sim in fake_api.sims]
+    await setup_integration(hass, config_entry)
+    entity_registry = er.async_get(hass)
+    device = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, sim_ids[2])})
+    assert device is not None
+    entity_ids = [
+        entity.entity_id
+        for entity in er.async_entries_for_device(entity_registry, device.id)
+    ]
+    assert entity_ids
+
+    fake_api.sims = fake_api.sims[:2]
+    await hass.data[DOMAIN][config_entry.entry_id].async_refresh()
+    await hass.async_block_till_done()
+
+    for entity_id in entity_ids:
+        assert entity_registry.async_get(entity_id) is None
+        assert hass.states.get(entity_id) is None
+    device = dr.async_get(hass).async_get(device.id)
+    assert device is None or config_entry.entry_id not in device.config_entries
+    assert _sim_sensors(hass, sim_ids[0])
+    assert _has_device(hass, sim_ids[0])
+
+
+@pytest.fixture
+async def deadband_coordinator(
+    hass: HomeAssistant, fake_api: FakeGraspletApi
+) -> GraspletDataUpdateCoordinator:
+    """Set up a 10 GB SIM with 8 GB left, a 5 GB deadband and a 70% event threshold."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id=USERNAME,
+        data={CONF_USERNAME: USERNAME, CONF_PASSWORD: PASSWORD, CONF_POLL_INTERVAL: 24},
+        options={
+            CONF_SIM_SENSORS: ["data_remaining"],
+            CONF_REMAINING_DEADBAND: 5,
+            CONF_REMAINING_DEADBAND_MODE: DEADBAND_ABSOLUTE,
+            CONF_EVENT_THRESHOLDS: ["70"],
+        },
+    )
+    entry.add_to_hass(hass)
+    fake_api.sims[0]["PlanUsageDetails"][0]["plan"]["dataLimit"] = 10
+    fake_api.update_sim(0, status="active", data=8.0, dataUnit="GB")
+    await setup_integration(hass, entry)
+    return hass.data[DOMAIN][entry.entry_id]
+
+
+async def _refresh_remaining(
+    hass: HomeAssistant,
+    fake_api: FakeGraspletApi,
+    coordinator: GraspletDataUpdateCoordinator,
+    data: float,
+) -> State:
+    """Refresh with new remaining data and return the first SIM's sensor state."""
+    fake_api.update_sim(0, data=data)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"{fake_api.sims[0]['id']}_data_remaining"
+    )
+    return hass.states.get(entity_id)
+
+
+async def test_deadband_suppresses_small_change(
+    hass: HomeAssistant,
+    fake_api: FakeGraspletApi,
+    deadband_coordinator: GraspletDataUpdateCoordinator,
+) -> None:
+    """A change smaller than the deadband that crosses no threshold is held back."""
+    # 75% left
+    state = await _refresh_remaining(hass, fake_api, deadband_coordinator, 7.5)
+    assert float(state.state) == 8.0
+    assert deadband_coordinator.metrics.deadband_suppressed == 1
+
+
+async def test_deadband_publishes_event_threshold_crossing(
+    hass: HomeAssistant,
+    fake_api: FakeGraspletApi,
+    deadband_coordinator: GraspletDataUpdateCoordinator,
+) -> None:
+    """A change inside the deadband is published when it crosses an event threshold."""
+    # 69% left is within 5 GB of the published 8 GB but below the 70% threshold
+    state = await _refresh_remaining(hass, fake_api, deadband_coordinator, 6.9)
+    assert float(state.state) == 6.9
+    assert deadband_coordinator.metrics.deadband_suppressed == 0